@@ -16,6 +16,8 @@ os.makedirs("Data", exist_ok=True)
 class PointsLeaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Serializes read-modify-write cycles on the points file.
+        self.points_lock = asyncio.Lock()
 
     def _load_points(self):
         if os.path.exists(POINTS_FILE):
@@ -27,21 +29,39 @@ class PointsLeaderboard(commands.Cog):
         return {}
 
     def _save_points(self, data):
-        with open(POINTS_FILE, "w") as f:
+        # Write-then-rename, so a crash mid-write never leaves a truncated file.
+        tmp_file = POINTS_FILE + ".tmp"
+        with open(tmp_file, "w") as f:
             json.dump(data, f, indent=4)
+        os.replace(tmp_file, POINTS_FILE)
 
-    async def add_points(self, user_id, amount):
+    def _apply_points(self, awards):
         data = self._load_points()
-        user_id = str(user_id)
-        data[user_id] = data.get(user_id, 0) + amount
+        totals = {}
+        for user_id, amount in awards.items():
+            key = str(user_id)
+            data[key] = data.get(key, 0) + amount
+            totals[user_id] = data[key]
         self._save_points(data)
+        return totals
+
+    async def add_points_bulk(self, awards):
+        """Adds {user_id: amount} in one load/save and returns {user_id: new_total}."""
+        if not awards:
+            return {}
+        async with self.points_lock:
+            return await asyncio.to_thread(self._apply_points, awards)
+
+    async def add_points(self, user_id, amount):
+        await self.add_points_bulk({user_id: amount})
 
     async def get_points(self, user_id):
         data = self._load_points()
         return data.get(str(user_id), 0)
 
     async def reset_leaderboard(self):
-        self._save_points({})
+        async with self.points_lock:
+            self._save_points({})
 
     async def get_leaderboard(self, limit=POINTS_DISPLAY_LIMIT):
         data = self._load_points()
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+
+load_dotenv()
+GAIA_SCHEDULER_WORKERS = int(os.getenv("GAIA_SCHEDULER_WORKERS", "8"))
+GAIA_SCHEDULER_MAX_PER_USER = int(os.getenv("GAIA_SCHEDULER_MAX_PER_USER", "3"))
+GAIA_SCHEDULER_MAX_PER_CHANNEL = int(os.getenv("GAIA_SCHEDULER_MAX_PER_CHANNEL", "10"))
+GAIA_SCHEDULER_MAX_QUEUED = int(os.getenv("GAIA_SCHEDULER_MAX_QUEUED", "100"))
+GAIA_SCHEDULER_MAX_PRIORITY = int(os.getenv("GAIA_SCHEDULER_MAX_PRIORITY", "20"))
+WAIT_SAMPLES = 200
+
+class SchedulerOverloaded(Exception):
+    """Raised by submit() when a request is shed; reason is "user", "channel" or "queue"."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"AI request queue full ({reason})")
+        self.reason = reason
+
+class _Job:
+    __slots__ = ("user_id", "channel_id", "priority", "factory", "future", "enqueued_at")
+
+    def __init__(self, user_id: int, channel_id: int, priority: bool, factory, future: asyncio.Future):
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.priority = priority
+        self.factory = factory
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+class AIScheduler:
+    """Fair queue in front of the GaiaNet calls.
+
+    At most `workers` requests run at once. Waiting requests are grouped by
+    channel and then by user, and dispatch takes turns: one request from the
+    next channel in line, from the user in that channel whose turn it is. So
+    a single busy user or channel can't starve everyone else. Each user may
+    have max_per_user requests outstanding and each channel max_per_channel
+    waiting; beyond that (or max_queued overall) requests are shed.
+    Priority requests (admins) wait in their own FIFO lane that is always
+    served first.
+    """
+
+    def __init__(self, workers: int = GAIA_SCHEDULER_WORKERS, max_per_user: int = GAIA_SCHEDULER_MAX_PER_USER,
+                 max_per_channel: int = GAIA_SCHEDULER_MAX_PER_CHANNEL, max_queued: int = GAIA_SCHEDULER_MAX_QUEUED,
+                 max_priority: int = GAIA_SCHEDULER_MAX_PRIORITY):
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.max_per_channel = max_per_channel
+        self.max_queued = max_queued
+        self.max_priority = max_priority
+        self.priority_lane: deque[_Job] = deque()
+        self.channels: OrderedDict[int, OrderedDict[int, deque[_Job]]] = OrderedDict()
+        self.channel_depth: dict[int, int] = {}
+        self.user_outstanding: dict[int, int] = {}
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.shed = {"user": 0, "channel": 0, "queue": 0}
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.max_wait = 0.0
+
+    def submit(self, user_id: int, channel_id: int, factory, priority: bool = False) -> asyncio.Future:
+        """Queues factory() and returns a future for its result. Raises
+        SchedulerOverloaded instead of queueing when the limits are hit."""
+        if priority:
+            if len(self.priority_lane) >= self.max_priority:
+                return self._shed("queue")
+        else:
+            if self.user_outstanding.get(user_id, 0) >= self.max_per_user:
+                return self._shed("user")
+            if self.channel_depth.get(channel_id, 0) >= self.max_per_channel:
+                return self._shed("channel")
+            if self.queued >= self.max_queued:
+                return self._shed("queue")
+
+        job = _Job(user_id, channel_id, priority, factory, asyncio.get_running_loop().create_future())
+        if priority:
+            self.priority_lane.append(job)
+        else:
+            users = self.channels.setdefault(channel_id, OrderedDict())
+            users.setdefault(user_id, deque()).append(job)
+            self.channel_depth[channel_id] = self.channel_depth.get(channel_id, 0) + 1
+            self.queued += 1
+        self.user_outstanding[user_id] = self.user_outstanding.get(user_id, 0) + 1
+        self._dispatch()
+        return job.future
+
+    async def run(self, user_id: int, channel_id: int, factory, priority: bool = False):
+        return await self.submit(user_id, channel_id, factory, priority)
+
+    def _shed(self, reason: str):
+        self.shed[reason] += 1
+        raise SchedulerOverloaded(reason)
+
+    def _next_job(self) -> _Job:
+        if self.priority_lane:
+            return self.priority_lane.popleft()
+        if not self.channels:
+            return None
+
+        channel_id, users = self.channels.popitem(last=False)
+        user_id, jobs = users.popitem(last=False)
+        job = jobs.popleft()
+        # The user and the channel go to the back of their lines.
+        if jobs:
+            users[user_id] = jobs
+        if users:
+            self.channels[channel_id] = users
+        self.queued -= 1
+        self.channel_depth[channel_id] -= 1
+        if not self.channel_depth[channel_id]:
+            del self.channel_depth[channel_id]
+        return job
+
+    def _dispatch(self):
+        while self.running < self.workers:
+            job = self._next_job()
+            if job is None:
+                return
+            if job.future.done():
+                # The caller gave up while waiting.
+                self._release(job)
+                continue
+            wait = time.monotonic() - job.enqueued_at
+            self.waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+            self.running += 1
+            asyncio.create_task(self._run(job))
+
+    async def _run(self, job: _Job):
+        try:
+            result = await job.factory()
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._release(job)
+            self._dispatch()
+
+    def _release(self, job: _Job):
+        remaining = self.user_outstanding[job.user_id] - 1
+        if remaining:
+            self.user_outstanding[job.user_id] = remaining
+        else:
+            del self.user_outstanding[job.user_id]
+
+    def stats(self) -> dict:
+        waits = sorted(self.waits)
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "priority_queued": len(self.priority_lane),
+            "busiest_channel_depth": max(self.channel_depth.values(), default=0),
+            "completed": self.completed,
+            "shed": dict(self.shed),
+            "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+ai_scheduler = AIScheduler()
@@ -0,0 +1,91 @@
+import itertools
+import os
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from Utilities.memory_index import MemoryIndex
+
+load_dotenv()
+GAIA_ANSWER_CACHE_ENABLED = os.getenv("GAIA_ANSWER_CACHE_ENABLED", "false").lower() == "true"
+GAIA_ANSWER_CACHE_THRESHOLD = float(os.getenv("GAIA_ANSWER_CACHE_THRESHOLD", "0.92"))
+GAIA_ANSWER_CACHE_TTL = float(os.getenv("GAIA_ANSWER_CACHE_TTL", "3600"))
+GAIA_ANSWER_CACHE_SIZE = int(os.getenv("GAIA_ANSWER_CACHE_SIZE", "500"))
+
+class SemanticAnswerCache:
+    """Serves earlier GaiaNet answers to questions that mean the same thing.
+
+    Each guild gets its own vector index of cached questions. Entries expire
+    after ttl seconds and the least recently served entry is evicted once
+    the cache holds max_entries answers across all guilds.
+    """
+
+    def __init__(self, threshold: float = GAIA_ANSWER_CACHE_THRESHOLD, ttl: float = GAIA_ANSWER_CACHE_TTL, max_entries: int = GAIA_ANSWER_CACHE_SIZE):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.indexes: dict[int, MemoryIndex] = {}
+        self.entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        self.next_id = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, guild_id: int, embedding):
+        index = self.indexes.get(guild_id)
+        if index is None:
+            self.misses += 1
+            return None
+
+        for entry_id, question, answer, similarity in index.search(embedding, k=1):
+            if similarity < self.threshold:
+                break
+            _, stored_at = self.entries[entry_id]
+            if time.time() - stored_at > self.ttl:
+                self._evict(entry_id)
+                break
+            self.entries.move_to_end(entry_id)
+            self.hits += 1
+            print(f"Answer cache hit for question similar to '{question}' (Similarity: {similarity:.2f})")
+            return answer
+
+        self.misses += 1
+        return None
+
+    def store(self, guild_id: int, question: str, embedding, answer: str):
+        entry_id = next(self.next_id)
+        self.indexes.setdefault(guild_id, MemoryIndex()).add(entry_id, question, answer, embedding)
+        self.entries[entry_id] = (guild_id, time.time())
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, entry_id: int):
+        guild_id, _ = self.entries.pop(entry_id)
+        index = self.indexes[guild_id]
+        index.remove(entry_id)
+        if not len(index):
+            del self.indexes[guild_id]
+
+    def flush(self, guild_id: int = None) -> int:
+        if guild_id is None:
+            flushed = len(self.entries)
+            self.entries.clear()
+            self.indexes.clear()
+            return flushed
+        stale = [entry_id for entry_id, (entry_guild, _) in self.entries.items() if entry_guild == guild_id]
+        for entry_id in stale:
+            self._evict(entry_id)
+        return len(stale)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": GAIA_ANSWER_CACHE_ENABLED,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,99 @@
+import os
+import re
+import unicodedata
+from dotenv import load_dotenv
+
+load_dotenv()
+ANSWER_MAX_TYPOS = int(os.getenv("ANSWER_MAX_TYPOS", "2"))
+
+_NON_ALNUM = re.compile(r"[^\w\s]|_")
+_LEADING_ARTICLE = re.compile(r"^(?:the|a|an)\s+(?=\S)")
+
+def normalize_answer(text: str) -> str:
+    """Lowercases, strips accents and punctuation, drops a leading article
+    and collapses whitespace: "  The Beyoncé!" -> "beyonce"."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = " ".join(_NON_ALNUM.sub(" ", text).split())
+    return _LEADING_ARTICLE.sub("", text)
+
+def allowed_typos(length: int, max_typos: int = ANSWER_MAX_TYPOS) -> int:
+    # Short answers must be exact, or "cat" would accept "car".
+    if length < 4:
+        return 0
+    if length < 8:
+        return min(1, max_typos)
+    return min(2, max_typos)
+
+def within_distance(a: str, b: str, k: int) -> bool:
+    """Levenshtein distance between a and b is at most k.
+
+    Only the diagonal band of width 2k+1 is filled in, and the comparison
+    stops as soon as a whole row exceeds k, so a miss usually costs a few
+    cells rather than len(a) * len(b).
+    """
+    if abs(len(a) - len(b)) > k:
+        return False
+    if a == b:
+        return True
+    if k == 0:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    too_far = k + 1
+    previous = [j if j <= k else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= k else too_far
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(max(1, i - k), min(len(b), i + k) + 1):
+            cost = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost < too_far else too_far
+            if current[j] < row_min:
+                row_min = current[j]
+        if row_min > k:
+            return False
+        previous = current
+    return previous[len(b)] <= k
+
+class AnswerMatcher:
+    """Accepted answers for one round, compiled once when the round starts.
+
+    The answer and its aliases are normalized up front and compared without
+    spaces, so "spider man", "Spider-Man" and "spiderman" are the same guess.
+    Answers with digits only match exactly; others accept typos within
+    allowed_typos() of their length. Instances are callable with a
+    normalize_answer() string, which is what the game router hands them.
+    """
+
+    __slots__ = ("answer", "variants", "fuzzy")
+
+    def __init__(self, answer: str, aliases=(), max_typos: int = ANSWER_MAX_TYPOS):
+        self.answer = answer
+        self.variants: set[str] = set()
+        self.fuzzy: list[tuple[str, int]] = []
+        for text in (answer, *aliases):
+            key = normalize_answer(text).replace(" ", "")
+            if not key or key in self.variants:
+                continue
+            self.variants.add(key)
+            typos = 0 if any(ch.isdigit() for ch in key) else allowed_typos(len(key), max_typos)
+            if typos:
+                self.fuzzy.append((key, typos))
+
+    def match(self, text: str):
+        """Returns the round's answer if the normalized guess matches, else None."""
+        guess = text.replace(" ", "")
+        if guess in self.variants:
+            return self.answer
+        for key, typos in self.fuzzy:
+            if within_distance(guess, key, typos):
+                return self.answer
+        return None
+
+    __call__ = match
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+import sqlite3
+from collections import OrderedDict, deque
+from dotenv import load_dotenv
+
+load_dotenv()
+CHAT_HISTORY_DB = os.getenv("CHAT_HISTORY_DB", "bot_memory.db")
+CHAT_HISTORY_FLUSH_INTERVAL = float(os.getenv("CHAT_HISTORY_FLUSH_INTERVAL", "30"))
+CHAT_HISTORY_RESIDENT_CHANNELS = int(os.getenv("CHAT_HISTORY_RESIDENT_CHANNELS", "500"))
+
+class Conversation:
+    __slots__ = ("messages", "summary")
+
+    def __init__(self, messages: deque, summary: str = None):
+        self.messages = messages
+        self.summary = summary
+
+class ChatHistoryStore:
+    """Write-behind cache of chat_histories.
+
+    Each conversation is a bounded ring buffer loaded lazily on first use.
+    Changes only mark the conversation dirty; dirty conversations are
+    written to SQLite in one transaction every flush_interval seconds and on
+    close(). At most max_resident conversations stay in memory, and an
+    evicted conversation that is still dirty waits for the next flush.
+    Older turns can be folded into a running summary kept next to the
+    messages. clear() bumps the conversation's epoch, so a fold or load
+    that started before the clear can't bring the old contents back.
+    """
+
+    def __init__(self, db_path: str = CHAT_HISTORY_DB, max_messages: int = 20, max_resident: int = CHAT_HISTORY_RESIDENT_CHANNELS, flush_interval: float = CHAT_HISTORY_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.max_messages = max_messages
+        self.max_resident = max_resident
+        self.flush_interval = flush_interval
+        self.histories: OrderedDict[str, Conversation] = OrderedDict()
+        self.dirty: set[str] = set()
+        self.evicted_dirty: dict[str, Conversation] = {}
+        self.loading: dict[str, asyncio.Task] = {}
+        self.epochs: dict[str, int] = {}
+        self.db_lock = asyncio.Lock()
+        self.conn: sqlite3.Connection = None
+        self.flush_task: asyncio.Task = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self.conn
+
+    def _read(self, conversation_id: str):
+        row = self._connect().execute(
+            'SELECT history, summary FROM chat_histories WHERE conversation_id = ?', (conversation_id,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else ([], None)
+
+    def _write(self, rows: list[tuple[str, str, str]]):
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO chat_histories (conversation_id, history, summary) VALUES (?, ?, ?)', rows
+            )
+
+    def _delete(self, conversation_id: str):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM chat_histories WHERE conversation_id = ?', (conversation_id,))
+
+    async def _load(self, conversation_id: str) -> Conversation:
+        async with self.db_lock:
+            messages, summary = await asyncio.to_thread(self._read, conversation_id)
+        return Conversation(deque(messages, maxlen=self.max_messages), summary)
+
+    async def _ensure_loaded(self, conversation_id: str) -> Conversation:
+        conversation = self.histories.get(conversation_id)
+        if conversation is not None:
+            self.histories.move_to_end(conversation_id)
+            return conversation
+
+        conversation = self.evicted_dirty.pop(conversation_id, None)
+        if conversation is None:
+            # Concurrent first requests for one conversation share one read.
+            epoch = self.epoch(conversation_id)
+            task = self.loading.get(conversation_id)
+            if task is None:
+                task = asyncio.create_task(self._load(conversation_id))
+                self.loading[conversation_id] = task
+            try:
+                conversation = await task
+            finally:
+                if self.loading.get(conversation_id) is task:
+                    del self.loading[conversation_id]
+            if conversation_id in self.histories:
+                return self.histories[conversation_id]
+            if self.epoch(conversation_id) != epoch:
+                # Cleared while the read was in flight.
+                conversation = Conversation(deque(maxlen=self.max_messages))
+        else:
+            self.dirty.add(conversation_id)
+
+        self.histories[conversation_id] = conversation
+        self._evict_overflow()
+        return conversation
+
+    def _evict_overflow(self):
+        while len(self.histories) > self.max_resident:
+            conversation_id, conversation = self.histories.popitem(last=False)
+            if conversation_id in self.dirty:
+                self.dirty.discard(conversation_id)
+                self.evicted_dirty[conversation_id] = conversation
+
+    async def get(self, conversation_id: str) -> list[dict]:
+        return list((await self._ensure_loaded(conversation_id)).messages)
+
+    async def get_with_summary(self, conversation_id: str) -> tuple[list[dict], str]:
+        conversation = await self._ensure_loaded(conversation_id)
+        return list(conversation.messages), conversation.summary
+
+    async def append(self, conversation_id: str, *messages: dict):
+        conversation = await self._ensure_loaded(conversation_id)
+        conversation.messages.extend(messages)
+        self.dirty.add(conversation_id)
+
+    def epoch(self, conversation_id: str) -> int:
+        return self.epochs.get(conversation_id, 0)
+
+    async def fold(self, conversation_id: str, folded: list[dict], summary: str, epoch: int = None):
+        # Drops the folded messages (matched by identity, in case the ring
+        # buffer already rotated some out) and stores the new summary.
+        # A summary computed before a clear() is discarded.
+        if epoch is not None and epoch != self.epoch(conversation_id):
+            return
+        conversation = await self._ensure_loaded(conversation_id)
+        if epoch is not None and epoch != self.epoch(conversation_id):
+            return
+        folded_ids = {id(message) for message in folded}
+        while conversation.messages and id(conversation.messages[0]) in folded_ids:
+            conversation.messages.popleft()
+        conversation.summary = summary
+        self.dirty.add(conversation_id)
+
+    async def clear(self, conversation_id: str):
+        self.epochs[conversation_id] = self.epoch(conversation_id) + 1
+        self.loading.pop(conversation_id, None)
+        self.histories.pop(conversation_id, None)
+        self.evicted_dirty.pop(conversation_id, None)
+        self.dirty.discard(conversation_id)
+        async with self.db_lock:
+            await asyncio.to_thread(self._delete, conversation_id)
+
+    async def flush(self):
+        if not self.dirty and not self.evicted_dirty:
+            return
+        resident = [cid for cid in self.dirty if cid in self.histories]
+        evicted = self.evicted_dirty
+        rows = [self._row(cid, self.histories[cid]) for cid in resident]
+        rows.extend(self._row(cid, conversation) for cid, conversation in evicted.items())
+        self.dirty = set()
+        self.evicted_dirty = {}
+        try:
+            async with self.db_lock:
+                await asyncio.to_thread(self._write, rows)
+        except Exception:
+            # Keep the changes around for the next flush attempt.
+            self.dirty.update(cid for cid in resident if cid in self.histories)
+            for cid, conversation in evicted.items():
+                self.evicted_dirty.setdefault(cid, conversation)
+            raise
+
+    @staticmethod
+    def _row(conversation_id: str, conversation: Conversation) -> tuple[str, str, str]:
+        return conversation_id, json.dumps(list(conversation.messages)), conversation.summary
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing chat histories: {e}")
+
+    def start(self):
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        await self.flush()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
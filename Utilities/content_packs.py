@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+CONTENT_PACK_CHECK_INTERVAL = float(os.getenv("CONTENT_PACK_CHECK_INTERVAL", "5"))
+
+class ContentRecord:
+    """Read-only record; subclasses only declare __slots__."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class TriviaQuestion(ContentRecord):
+    __slots__ = ("question", "answer", "aliases")
+
+class EmojiClue(ContentRecord):
+    __slots__ = ("emoji", "answer", "aliases")
+
+class LyricLine(ContentRecord):
+    __slots__ = ("line", "answer", "aliases")
+
+def _text(item: dict, field: str) -> str:
+    value = item.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"`{field}` must be a non-empty string")
+    return sys.intern(value.strip())
+
+def _aliases(item: dict) -> tuple[str, ...]:
+    value = item.get("aliases", ())
+    if not isinstance(value, (list, tuple)) or not all(isinstance(alias, str) for alias in value):
+        raise ValueError("`aliases` must be a list of strings")
+    return tuple(sys.intern(alias.strip()) for alias in value if alias.strip())
+
+def _record_parser(record_type, prompt_field: str):
+    def parse(item):
+        if not isinstance(item, dict):
+            raise ValueError("expected a JSON object")
+        return record_type(_text(item, prompt_field), _text(item, "answer"), _aliases(item))
+    return parse
+
+def parse_scramble_word(item) -> str:
+    if not isinstance(item, str) or not item.strip():
+        raise ValueError("expected a non-empty string")
+    word = item.strip()
+    # A word made of one repeated letter can never be shown scrambled.
+    if len(set(word.lower())) < 2:
+        raise ValueError(f"`{word}` has fewer than two distinct letters")
+    return sys.intern(word)
+
+class ContentPack:
+    __slots__ = ("path", "parse", "items", "mtime_ns", "size", "checked_at", "errors")
+
+    def __init__(self, path: str, parse):
+        self.path = path
+        self.parse = parse
+        self.items: tuple = ()
+        self.mtime_ns = None
+        self.size = None
+        self.checked_at = 0.0
+        self.errors: list[str] = []
+
+PACKS = {
+    "trivia": ("Data/trivia_questions.json", _record_parser(TriviaQuestion, "question")),
+    "scramble": ("Data/scramble_words.json", parse_scramble_word),
+    "emoji": ("Data/emoji_clues.json", _record_parser(EmojiClue, "emoji")),
+    "lyrics_india": ("Data/lyrics_India.json", _record_parser(LyricLine, "line")),
+    "lyrics_pakistan": ("Data/lyrics_Pakistan.json", _record_parser(LyricLine, "line")),
+    "lyrics_nigeria": ("Data/lyrics_Nigeria.json", _record_parser(LyricLine, "line")),
+    "lyrics_global": ("Data/lyrics_global.json", _record_parser(LyricLine, "line")),
+}
+
+class ContentPackLoader:
+    """Game datasets from Data/*.json, parsed once into read-only records.
+
+    get() returns a pack's current tuple of records. At most every
+    `check_interval` seconds it stats the file, and when the mtime or size
+    changed it re-parses the file off the event loop and swaps the new
+    tuple in as a whole. A file that is missing or isn't valid JSON keeps
+    the last good version; entries that fail validation are skipped and
+    reported in `errors`.
+    """
+
+    def __init__(self, packs: dict = PACKS, check_interval: float = CONTENT_PACK_CHECK_INTERVAL):
+        self.packs = {name: ContentPack(path, parse) for name, (path, parse) in packs.items()}
+        self.check_interval = check_interval
+        self.lock = asyncio.Lock()
+        self.reloads = 0
+
+    def _read(self, pack: ContentPack):
+        with open(pack.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON list")
+        items, errors = [], []
+        for position, item in enumerate(data):
+            try:
+                items.append(pack.parse(item))
+            except ValueError as e:
+                errors.append(f"entry {position}: {e}")
+        return tuple(items), errors
+
+    async def _refresh(self, name: str, pack: ContentPack):
+        try:
+            stat = os.stat(pack.path)
+        except FileNotFoundError:
+            if pack.mtime_ns is not None or not pack.errors:
+                print(f"Error: {pack.path} not found! Keeping {len(pack.items)} loaded {name} entries.")
+                pack.errors = [f"{pack.path} not found"]
+                pack.mtime_ns = pack.size = None
+            return
+        if (stat.st_mtime_ns, stat.st_size) == (pack.mtime_ns, pack.size):
+            return
+        pack.mtime_ns, pack.size = stat.st_mtime_ns, stat.st_size
+        try:
+            items, errors = await asyncio.to_thread(self._read, pack)
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+            print(f"Error: {pack.path} is corrupted or empty ({e}). Keeping {len(pack.items)} loaded {name} entries.")
+            pack.errors = [str(e)]
+            return
+        pack.items, pack.errors = items, errors
+        self.reloads += 1
+        print(f"Loaded {len(items)} {name} entries from {pack.path}" + (f" ({len(errors)} invalid skipped)." if errors else "."))
+        for error in errors[:5]:
+            print(f"  {pack.path} {error}")
+
+    async def get(self, name: str) -> tuple:
+        pack = self.packs[name]
+        now = time.monotonic()
+        if now - pack.checked_at >= self.check_interval:
+            async with self.lock:
+                if now - pack.checked_at >= self.check_interval:
+                    await self._refresh(name, pack)
+                    pack.checked_at = time.monotonic()
+        return pack.items
+
+    def stats(self) -> dict:
+        return {name: {"items": len(pack.items), "errors": len(pack.errors)} for name, pack in self.packs.items()}
+
+content_packs = ContentPackLoader()
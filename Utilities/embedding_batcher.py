@@ -0,0 +1,74 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from Utilities.gaia_client import GAIANET_EMBEDDING_MODEL, create_embeddings
+
+load_dotenv()
+GAIANET_EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("GAIANET_EMBEDDING_BATCH_WINDOW_MS", "5"))
+GAIANET_EMBEDDING_MAX_BATCH = int(os.getenv("GAIANET_EMBEDDING_MAX_BATCH", "64"))
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into one embeddings.create call.
+
+    Requests for the same model are held for at most window_ms (or until
+    max_batch texts are waiting), sent as a single list input, and each
+    caller's future is resolved with its own vector.
+    """
+
+    def __init__(self, window_ms: float = GAIANET_EMBEDDING_BATCH_WINDOW_MS, max_batch: int = GAIANET_EMBEDDING_MAX_BATCH):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self.timers: dict[str, asyncio.TimerHandle] = {}
+        self.batches_sent = 0
+        self.texts_sent = 0
+        self.requests = 0
+
+    async def embed(self, text: str, model: str = GAIANET_EMBEDDING_MODEL) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.pending.setdefault(model, [])
+        batch.append((text, future))
+        self.requests += 1
+
+        if len(batch) >= self.max_batch:
+            self._flush(model)
+        elif model not in self.timers:
+            self.timers[model] = loop.call_later(self.window, self._flush, model)
+        return await future
+
+    def _flush(self, model: str):
+        timer = self.timers.pop(model, None)
+        if timer:
+            timer.cancel()
+        batch = self.pending.pop(model, None)
+        if batch:
+            asyncio.create_task(self._send(model, batch))
+
+    async def _send(self, model: str, batch: list[tuple[str, asyncio.Future]]):
+        # Identical texts in one window are only sent once.
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches_sent += 1
+        self.texts_sent += len(unique_texts)
+        try:
+            vectors = await create_embeddings(unique_texts, model=model)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches_sent": self.batches_sent,
+            "texts_sent": self.texts_sent,
+            "avg_batch_size": self.texts_sent / self.batches_sent if self.batches_sent else 0.0,
+        }
+
+embedding_batcher = EmbeddingBatcher()
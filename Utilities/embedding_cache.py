@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from dotenv import load_dotenv
+from Utilities.gaia_client import GAIANET_EMBEDDING_MODEL
+from Utilities.embedding_batcher import embedding_batcher
+from Utilities.single_flight import SingleFlight
+
+load_dotenv()
+EMBEDDING_CACHE_DB = os.getenv("EMBEDDING_CACHE_DB", "bot_memory.db")
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048"))
+EMBEDDING_CACHE_DISK_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "50000"))
+# How many disk writes between eviction passes over the SQLite tier.
+EVICTION_CHECK_INTERVAL = 100
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def cache_key(text: str, model: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+class EmbeddingCache:
+    """In-process LRU in front of a persistent SQLite table of embeddings.
+
+    Both tiers are keyed by model name plus a hash of the normalized text and
+    evict least-recently-used entries once they pass their size limit.
+    """
+
+    def __init__(self, db_path: str = EMBEDDING_CACHE_DB, memory_entries: int = EMBEDDING_CACHE_MEMORY_ENTRIES, disk_entries: int = EMBEDDING_CACHE_DISK_ENTRIES):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.conn: sqlite3.Connection = None
+        self.db_lock = threading.Lock()
+        self.writes_since_eviction = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used ON embedding_cache (last_used)')
+            self.conn.commit()
+        return self.conn
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _disk_get(self, key: str):
+        with self.db_lock:
+            conn = self._connect()
+            row = conn.execute('SELECT embedding FROM embedding_cache WHERE cache_key = ?', (key,)).fetchone()
+            if row:
+                conn.execute('UPDATE embedding_cache SET last_used = ? WHERE cache_key = ?', (time.time(), key))
+                conn.commit()
+        return row[0] if row else None
+
+    def _disk_put(self, key: str, model: str, blob: bytes):
+        with self.db_lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO embedding_cache (cache_key, model, embedding, last_used) VALUES (?, ?, ?, ?)',
+                (key, model, blob, time.time())
+            )
+            self.writes_since_eviction += 1
+            if self.writes_since_eviction >= EVICTION_CHECK_INTERVAL:
+                self.writes_since_eviction = 0
+                (count,) = conn.execute('SELECT COUNT(*) FROM embedding_cache').fetchone()
+                if count > self.disk_entries:
+                    conn.execute(
+                        'DELETE FROM embedding_cache WHERE cache_key IN '
+                        '(SELECT cache_key FROM embedding_cache ORDER BY last_used LIMIT ?)',
+                        (count - self.disk_entries,)
+                    )
+            conn.commit()
+
+    def get_resident(self, text: str, model: str = GAIANET_EMBEDDING_MODEL):
+        key = cache_key(text, model)
+        vector = self.memory.get(key)
+        if vector is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+        return vector
+
+    async def get(self, text: str, model: str = GAIANET_EMBEDDING_MODEL):
+        vector = self.get_resident(text, model)
+        if vector is not None:
+            return vector
+
+        key = cache_key(text, model)
+        blob = await asyncio.to_thread(self._disk_get, key)
+        if blob is not None:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+
+        self.misses += 1
+        return None
+
+    async def put(self, text: str, embedding, model: str = GAIANET_EMBEDDING_MODEL) -> np.ndarray:
+        key = cache_key(text, model)
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector.setflags(write=False)
+        self._remember(key, vector)
+        await asyncio.to_thread(self._disk_put, key, model, vector.tobytes())
+        return vector
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+    def close(self):
+        with self.db_lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+embedding_cache = EmbeddingCache()
+embedding_flights = SingleFlight()
+
+async def _lookup_or_embed(text: str, model: str) -> np.ndarray:
+    vector = await embedding_cache.get(text, model)
+    if vector is not None:
+        return vector
+    embedding = await embedding_batcher.embed(text, model)
+    return await embedding_cache.put(text, embedding, model)
+
+async def get_embedding(text: str, model: str = GAIANET_EMBEDDING_MODEL) -> np.ndarray:
+    vector = embedding_cache.get_resident(text, model)
+    if vector is not None:
+        return vector
+    # Concurrent misses for the same text share one disk read and one API call.
+    return await embedding_flights.run(cache_key(text, model), lambda: _lookup_or_embed(text, model))
+
+async def get_embeddings(texts: list[str], model: str = GAIANET_EMBEDDING_MODEL) -> list[np.ndarray]:
+    return await asyncio.gather(*(get_embedding(text, model) for text in texts))
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from dotenv import load_dotenv
+from Utilities.gaia_router import Endpoint, GaiaRouter
+
+load_dotenv()
+GAIANET_API_KEY = os.getenv("GAIANET_API_KEY")
+GAIANET_BASE_URL = os.getenv("GAIANET_BASE_URL")
+GAIANET_MODEL_NAME = os.getenv("GAIANET_MODEL_NAME")
+GAIANET_EMBEDDING_BASE_URL = os.getenv("GAIANET_EMBEDDING_BASE_URL", "https://qwen7b.gaia.domains/v1")
+# The model older versions embedded with: they read the misspelled
+# GAIANET_EMBEDDING_EMBEDDING_MODEL, which is still honoured as a fallback.
+GAIANET_LEGACY_EMBEDDING_MODEL = os.getenv("GAIANET_EMBEDDING_EMBEDDING_MODEL") or "nomic-embed-text-v1.5.f16"
+GAIANET_EMBEDDING_MODEL = os.getenv("GAIANET_EMBEDDING_MODEL") or GAIANET_LEGACY_EMBEDDING_MODEL
+# Comma-separated pools of equivalent nodes; the single-URL settings above are the fallback.
+GAIANET_BASE_URLS = [url.strip() for url in (os.getenv("GAIANET_BASE_URLS") or GAIANET_BASE_URL or "").split(",") if url.strip()]
+GAIANET_EMBEDDING_BASE_URLS = [url.strip() for url in (os.getenv("GAIANET_EMBEDDING_BASE_URLS") or GAIANET_EMBEDDING_BASE_URL).split(",") if url.strip()]
+
+GAIANET_MAX_CONCURRENT_REQUESTS = int(os.getenv("GAIANET_MAX_CONCURRENT_REQUESTS", "8"))
+GAIANET_MAX_CONCURRENT_EMBEDDINGS = int(os.getenv("GAIANET_MAX_CONCURRENT_EMBEDDINGS", "8"))
+GAIANET_POOL_SIZE = int(os.getenv("GAIANET_POOL_SIZE", "20"))
+GAIANET_REQUEST_TIMEOUT = float(os.getenv("GAIANET_REQUEST_TIMEOUT", "60"))
+GAIANET_CONNECT_TIMEOUT = float(os.getenv("GAIANET_CONNECT_TIMEOUT", "10"))
+GAIANET_KEEPALIVE_SECONDS = float(os.getenv("GAIANET_KEEPALIVE_SECONDS", "60"))
+GAIANET_HEDGE_CHAT = os.getenv("GAIANET_HEDGE_CHAT", "false").lower() == "true"
+GAIANET_HEDGE_EMBEDDINGS = os.getenv("GAIANET_HEDGE_EMBEDDINGS", "true").lower() == "true"
+GAIANET_HEDGE_MIN_DELAY = float(os.getenv("GAIANET_HEDGE_MIN_DELAY", "0.5"))
+GAIANET_CIRCUIT_FAILURES = int(os.getenv("GAIANET_CIRCUIT_FAILURES", "3"))
+GAIANET_CIRCUIT_COOLDOWN = float(os.getenv("GAIANET_CIRCUIT_COOLDOWN", "30"))
+
+def _make_async_client(base_url: str) -> AsyncOpenAI:
+    # Keep-alive connections are reused between requests, so a burst of
+    # questions doesn't pay a TLS handshake each time.
+    return AsyncOpenAI(
+        base_url=base_url,
+        api_key=GAIANET_API_KEY,
+        timeout=httpx.Timeout(GAIANET_REQUEST_TIMEOUT, connect=GAIANET_CONNECT_TIMEOUT),
+        max_retries=1,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=GAIANET_POOL_SIZE,
+                max_keepalive_connections=GAIANET_POOL_SIZE,
+                keepalive_expiry=GAIANET_KEEPALIVE_SECONDS
+            )
+        )
+    )
+
+def _make_router(base_urls: list[str], hedge: bool) -> GaiaRouter:
+    endpoints = [
+        Endpoint(url, _make_async_client(url), GAIANET_CIRCUIT_FAILURES, GAIANET_CIRCUIT_COOLDOWN)
+        for url in base_urls or [None]
+    ]
+    return GaiaRouter(endpoints, hedge=hedge, hedge_min_delay=GAIANET_HEDGE_MIN_DELAY)
+
+# One pooled client per node, shared by bot.py and the WYR game.
+chat_router = _make_router(GAIANET_BASE_URLS, GAIANET_HEDGE_CHAT)
+embedding_router = _make_router(GAIANET_EMBEDDING_BASE_URLS, GAIANET_HEDGE_EMBEDDINGS)
+
+# Global caps on requests in flight.
+_inflight_requests = asyncio.Semaphore(GAIANET_MAX_CONCURRENT_REQUESTS)
+_inflight_embeddings = asyncio.Semaphore(GAIANET_MAX_CONCURRENT_EMBEDDINGS)
+
+async def create_chat_completion(messages: list[dict], temperature: float = 0.7, max_tokens: int = 500, timeout: float = None):
+    async with _inflight_requests:
+        return await chat_router.call(lambda client: client.chat.completions.create(
+            model=GAIANET_MODEL_NAME,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout or GAIANET_REQUEST_TIMEOUT
+        ))
+
+async def stream_chat_completion(messages: list[dict], temperature: float = 0.7, max_tokens: int = 500, timeout: float = None):
+    async with _inflight_requests:
+        stream = chat_router.stream(lambda client: client.chat.completions.create(
+            model=GAIANET_MODEL_NAME,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout or GAIANET_REQUEST_TIMEOUT,
+            stream=True
+        ))
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+async def create_embeddings(texts: list[str], model: str = GAIANET_EMBEDDING_MODEL) -> list[list[float]]:
+    async with _inflight_embeddings:
+        response = await embedding_router.call(lambda client: client.embeddings.create(model=model, input=texts))
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+async def close_gaia_client():
+    await chat_router.close()
+    await embedding_router.close()
@@ -0,0 +1,196 @@
+import asyncio
+import time
+from collections import deque
+
+EWMA_ALPHA = 0.2
+LATENCY_SAMPLES = 100
+MIN_SAMPLES_FOR_P95 = 5
+
+class Endpoint:
+    """One OpenAI-compatible GaiaNet node plus its health statistics."""
+
+    def __init__(self, base_url: str, client, failure_threshold: int, cooldown: float):
+        self.base_url = base_url
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_latency: float = None
+        self.error_rate = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.open_until
+
+    def score(self) -> float:
+        # Unmeasured nodes score 0 so they get tried early.
+        latency = self.ewma_latency or 0.0
+        return latency * (1 + self.in_flight) * (1 + self.error_rate)
+
+    def p95(self):
+        if len(self.latencies) < MIN_SAMPLES_FOR_P95:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.latencies.append(latency)
+        self.ewma_latency = latency if self.ewma_latency is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            # Open the circuit; once the cooldown passes the next request is a trial.
+            self.open_until = time.monotonic() + self.cooldown
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "ewma_latency": self.ewma_latency,
+            "p95": self.p95(),
+            "error_rate": self.error_rate,
+            "circuit_open": not self.is_available(time.monotonic()),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+class GaiaRouter:
+    """Routes requests across a pool of GaiaNet endpoints.
+
+    Each request goes to the healthy endpoint with the best EWMA latency.
+    Failed requests fail over to the next endpoint, and endpoints that keep
+    failing are skipped until their circuit cooldown ends. With hedging on,
+    a duplicate request goes to a second endpoint when the first hasn't
+    answered within its p95 latency, and whichever finishes first wins.
+    """
+
+    def __init__(self, endpoints: list[Endpoint], hedge: bool = False, hedge_min_delay: float = 0.5):
+        self.endpoints = endpoints
+        self.hedge = hedge and len(endpoints) > 1
+        self.hedge_min_delay = hedge_min_delay
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def pick(self, exclude=(), allow_open: bool = False) -> Endpoint:
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e not in exclude and e.is_available(now)]
+        if candidates:
+            return min(candidates, key=Endpoint.score)
+        if allow_open:
+            # Every circuit is open: try the one that recovers soonest rather than fail outright.
+            remaining = [e for e in self.endpoints if e not in exclude]
+            if remaining:
+                return min(remaining, key=lambda e: e.open_until)
+        return None
+
+    async def _attempt(self, endpoint: Endpoint, request):
+        endpoint.in_flight += 1
+        start = time.monotonic()
+        try:
+            result = await request(endpoint.client)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.record_failure()
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        endpoint.record_success(time.monotonic() - start)
+        return result
+
+    def _hedge_delay(self, endpoint: Endpoint):
+        p95 = endpoint.p95()
+        return max(self.hedge_min_delay, p95) if p95 is not None else None
+
+    async def call(self, request):
+        primary = self.pick(allow_open=True)
+        tried = {primary}
+        hedged = set()
+        tasks = {asyncio.ensure_future(self._attempt(primary, request)): primary}
+        hedge_delay = self._hedge_delay(primary) if self.hedge else None
+        last_error = None
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_delay = None
+                    backup = self.pick(exclude=tried)
+                    if backup:
+                        tried.add(backup)
+                        hedged.add(backup)
+                        tasks[asyncio.ensure_future(self._attempt(backup, request))] = backup
+                        self.hedges_sent += 1
+                    continue
+
+                for task in done:
+                    endpoint = tasks.pop(task)
+                    if task.exception() is None:
+                        if endpoint in hedged:
+                            self.hedges_won += 1
+                        return task.result()
+                    last_error = task.exception()
+                    print(f"GaiaNet request to {endpoint.base_url} failed: {last_error}")
+
+                if not tasks:
+                    hedge_delay = None
+                    fallback = self.pick(exclude=tried)
+                    if fallback is None:
+                        raise last_error
+                    tried.add(fallback)
+                    tasks[asyncio.ensure_future(self._attempt(fallback, request))] = fallback
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(self, open_stream):
+        # Streams can't be hedged, but they fail over until the first chunk arrives.
+        tried = set()
+        endpoint = self.pick(allow_open=True)
+        while True:
+            tried.add(endpoint)
+            endpoint.in_flight += 1
+            start = time.monotonic()
+            started = False
+            try:
+                async for chunk in await open_stream(endpoint.client):
+                    if not started:
+                        started = True
+                        endpoint.record_success(time.monotonic() - start)
+                    yield chunk
+                if not started:
+                    endpoint.record_success(time.monotonic() - start)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                endpoint.record_failure()
+                print(f"GaiaNet stream from {endpoint.base_url} failed: {e}")
+                fallback = None if started else self.pick(exclude=tried)
+                if fallback is None:
+                    raise
+            finally:
+                endpoint.in_flight -= 1
+            endpoint = fallback
+
+    def stats(self) -> dict:
+        return {
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints],
+        }
+
+    async def close(self):
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
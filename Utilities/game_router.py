@@ -0,0 +1,65 @@
+import asyncio
+from discord.ext import commands
+from Utilities.answer_matcher import normalize_answer
+
+class _AnswerWaiter:
+    __slots__ = ("matcher", "future")
+
+    def __init__(self, matcher, future: asyncio.Future):
+        self.matcher = matcher
+        self.future = future
+
+class GameMessageRouter(commands.Cog):
+    """Routes chat messages to the game rounds waiting on their channel.
+
+    Games register a matcher for their channel with wait_for_answer()
+    instead of bot.wait_for("message"), so one on_message listener looks up
+    the channel in a dict, normalizes the content once and only runs that
+    channel's matchers. A matcher gets the normalize_answer() text and
+    returns a truthy match value to accept the message.
+    """
+
+    def __init__(self):
+        self.waiters: dict[int, list[_AnswerWaiter]] = {}
+        self.dispatched = 0
+
+    async def wait_for_answer(self, channel_id: int, matcher, timeout: float):
+        """Waits for the next matching message in the channel and returns
+        (message, match). Raises asyncio.TimeoutError like bot.wait_for."""
+        waiter = _AnswerWaiter(matcher, asyncio.get_running_loop().create_future())
+        self.waiters.setdefault(channel_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        finally:
+            channel_waiters = self.waiters.get(channel_id)
+            if channel_waiters is not None:
+                if waiter in channel_waiters:
+                    channel_waiters.remove(waiter)
+                if not channel_waiters:
+                    del self.waiters[channel_id]
+
+    def dispatch(self, message):
+        channel_waiters = self.waiters.get(message.channel.id)
+        if not channel_waiters or message.author.bot:
+            return
+        text = normalize_answer(message.content)
+        for waiter in channel_waiters:
+            if waiter.future.done():
+                continue
+            try:
+                match = waiter.matcher(text)
+            except Exception as e:
+                print(f"Error in game answer matcher: {e}")
+                continue
+            if match:
+                waiter.future.set_result((message, match))
+                self.dispatched += 1
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        self.dispatch(message)
+
+game_message_router = GameMessageRouter()
+
+async def setup(bot):
+    await bot.add_cog(game_message_router)
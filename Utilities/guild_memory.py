@@ -0,0 +1,190 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+from Utilities.memory_index import MemoryIndex
+
+load_dotenv()
+GAIA_MEMORY_IDLE_SECONDS = float(os.getenv("GAIA_MEMORY_IDLE_SECONDS", "1800"))
+IDLE_SWEEP_INTERVAL = 60
+
+class GuildMemory:
+    """One guild's permanent memories: the main index for the current
+    embedding model plus one exact index per stale model, whose rows are
+    searched with that model's query vectors until they are re-embedded."""
+
+    __slots__ = ("index", "stale", "last_used")
+
+    def __init__(self, index: MemoryIndex):
+        self.index = index
+        self.stale: dict[str, MemoryIndex] = {}
+        self.last_used = time.monotonic()
+
+    def __len__(self):
+        return len(self.index) + sum(len(index) for index in self.stale.values())
+
+    def _indexes(self):
+        return (self.index, *self.stale.values())
+
+    def load(self, rows, aliases, model: str):
+        current, stale = [], {}
+        for memory_id, keyword, answer, embedding, row_model in rows:
+            target = current if row_model == model else stale.setdefault(row_model, [])
+            target.append((memory_id, keyword, answer, embedding))
+        self.index.load(current)
+        self.stale.clear()
+        for row_model, stale_rows in stale.items():
+            self.stale[row_model] = MemoryIndex()
+            self.stale[row_model].load(stale_rows)
+        for alias, memory_id in aliases:
+            for index in self._indexes():
+                if memory_id in index:
+                    index.add_alias(alias, memory_id)
+                    break
+
+    def lookup_exact(self, text: str):
+        for index in self._indexes():
+            match = index.lookup_exact(text)
+            if match:
+                return match
+        return None
+
+    async def search(self, text: str, embedding, embed_with_model):
+        best = None
+        for hit in self.index.search(embedding, k=1):
+            best = hit
+        for model, index in list(self.stale.items()):
+            try:
+                stale_embedding = await embed_with_model(text, model)
+            except Exception as e:
+                print(f"Error embedding query with stale model {model}: {e}")
+                continue
+            for hit in index.search(stale_embedding, k=1):
+                if best is None or hit[3] > best[3]:
+                    best = hit
+        return best
+
+    def add(self, memory_id: int, keyword: str, answer: str, embedding, aliases=()):
+        self.index.add(memory_id, keyword, answer, embedding)
+        for alias in aliases:
+            self.index.add_alias(alias, memory_id)
+
+    def remove(self, memory_id: int) -> bool:
+        removed = self.index.remove(memory_id)
+        for model, index in list(self.stale.items()):
+            if index.remove(memory_id):
+                removed = True
+                if not len(index):
+                    del self.stale[model]
+        return removed
+
+    def migrate(self, memory_id: int, keyword: str, answer: str, embedding, old_model: str):
+        # Moves a re-embedded row, with its aliases, into the main index.
+        aliases = []
+        stale_index = self.stale.get(old_model)
+        if stale_index is not None:
+            aliases = list(stale_index.exact_keys.get(memory_id, []))
+            stale_index.remove(memory_id)
+            if not len(stale_index):
+                del self.stale[old_model]
+        self.add(memory_id, keyword, answer, embedding, aliases)
+
+class GuildMemoryRegistry:
+    """Lazily loaded GuildMemory per guild.
+
+    A guild's memories are read from the database the first time one of its
+    questions needs them (concurrent first requests share one load) and are
+    dropped again after idle_seconds without use, so each query only ever
+    scans its own guild's rows. Writers go through apply(): a write that
+    lands while the guild is loading makes the load read again, since the
+    rows it read may predate the write.
+    """
+
+    def __init__(self, loader, index_factory, model: str, idle_seconds: float = GAIA_MEMORY_IDLE_SECONDS):
+        self.loader = loader
+        self.index_factory = index_factory
+        self.model = model
+        self.idle_seconds = idle_seconds
+        self.loaded: dict[int, GuildMemory] = {}
+        self.loading: dict[int, asyncio.Task] = {}
+        self.reload_pending: set[int] = set()
+        self.sweep_task: asyncio.Task = None
+        self.loads = 0
+        self.evictions = 0
+
+    async def _load(self, guild_id: int) -> GuildMemory:
+        try:
+            while True:
+                self.reload_pending.discard(guild_id)
+                rows, aliases = await asyncio.to_thread(self.loader, guild_id)
+                memory = GuildMemory(self.index_factory(guild_id))
+                await asyncio.to_thread(memory.load, rows, aliases, self.model)
+                self.loads += 1
+                if guild_id not in self.reload_pending:
+                    break
+            # Published in the same step that clears `loading`, so a writer
+            # always sees either the load in flight or the loaded index.
+            return self.loaded.setdefault(guild_id, memory)
+        finally:
+            self.loading.pop(guild_id, None)
+            self.reload_pending.discard(guild_id)
+
+    async def get(self, guild_id: int) -> GuildMemory:
+        memory = self.loaded.get(guild_id)
+        if memory is None:
+            task = self.loading.get(guild_id)
+            if task is None:
+                task = asyncio.create_task(self._load(guild_id))
+                self.loading[guild_id] = task
+            memory = await asyncio.shield(task)
+        memory.last_used = time.monotonic()
+        return memory
+
+    def apply(self, guild_id: int, change):
+        """Runs change(memory) against the guild's loaded index after a committed write."""
+        memory = self.loaded.get(guild_id)
+        if memory is not None:
+            change(memory)
+        elif guild_id in self.loading:
+            self.reload_pending.add(guild_id)
+        # Guilds that aren't loaded pick up database changes on their next load.
+
+    def invalidate(self, guild_id: int = None):
+        for gid in [guild_id] if guild_id is not None else list(self.loaded):
+            memory = self.loaded.pop(gid, None)
+            if memory is not None:
+                memory.index.save()
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        for guild_id, memory in list(self.loaded.items()):
+            if memory.last_used < cutoff:
+                del self.loaded[guild_id]
+                memory.index.save()
+                self.evictions += 1
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(IDLE_SWEEP_INTERVAL)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                print(f"Error evicting idle guild memory indexes: {e}")
+
+    def start(self):
+        if self.sweep_task is None or self.sweep_task.done():
+            self.sweep_task = asyncio.create_task(self._sweep_loop())
+
+    def close(self):
+        if self.sweep_task:
+            self.sweep_task.cancel()
+            self.sweep_task = None
+        self.invalidate()
+
+    def stats(self) -> dict:
+        return {
+            "loaded_guilds": len(self.loaded),
+            "loaded_entries": sum(len(memory) for memory in self.loaded.values()),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,328 @@
+import os
+import numpy as np
+from dotenv import load_dotenv
+from Utilities.memory_index import MemoryIndex, normalize_vector
+
+load_dotenv()
+GAIA_MEMORY_INDEX = os.getenv("GAIA_MEMORY_INDEX", "exact").lower()
+GAIA_IVF_PATH = os.getenv("GAIA_IVF_PATH", "bot_memory.ivf.npz")
+GAIA_IVF_NPROBE = int(os.getenv("GAIA_IVF_NPROBE", "16"))
+GAIA_IVF_MIN_TRAIN = int(os.getenv("GAIA_IVF_MIN_TRAIN", "2048"))
+# 0 picks 2 * sqrt(entries) lists when the index is trained.
+GAIA_IVF_LISTS = int(os.getenv("GAIA_IVF_LISTS", "0"))
+
+INITIAL_LIST_CAPACITY = 16
+TRAIN_POINTS_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+ASSIGN_CHUNK = 8192
+# Trained list vectors are stored as int8 with one float32 scale per row: a
+# quarter of the float32 footprint, and cosine scores stay within about 0.01.
+QUANTIZED_MAX = 127
+# Retrain on load once the index has grown this much past its last training.
+RETRAIN_GROWTH = 4
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignment = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        chunk = vectors[start:start + ASSIGN_CHUNK]
+        assignment[start:start + ASSIGN_CHUNK] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+def train_centroids(vectors: np.ndarray, nlist: int, rng: np.random.Generator, iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """Spherical k-means over a sample of the (normalized) vectors."""
+    sample_size = min(len(vectors), nlist * TRAIN_POINTS_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)].astype(np.float32)
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = nearest_centroids(sample, centroids)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=nlist)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts[filled])[:-1]))
+        centroids[filled] = np.add.reduceat(sample[order], starts, axis=0)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Reseed empty lists on random sample points.
+            centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+class _InvertedList:
+    __slots__ = ("matrix", "scales", "ids", "size", "quantized")
+
+    def __init__(self, dim: int, quantized: bool = True):
+        self.quantized = quantized
+        self.matrix = np.zeros((INITIAL_LIST_CAPACITY, dim), dtype=np.int8 if quantized else np.float32)
+        self.scales = np.zeros(INITIAL_LIST_CAPACITY, dtype=np.float32)
+        self.ids = np.zeros(INITIAL_LIST_CAPACITY, dtype=np.int64)
+        self.size = 0
+
+    def append(self, memory_id: int, vec: np.ndarray) -> int:
+        if self.size == len(self.ids):
+            self.matrix = np.concatenate((self.matrix, np.zeros_like(self.matrix)))
+            self.scales = np.concatenate((self.scales, np.zeros_like(self.scales)))
+            self.ids = np.concatenate((self.ids, np.zeros_like(self.ids)))
+        if self.quantized:
+            scale = float(np.abs(vec).max()) / QUANTIZED_MAX or 1.0
+            self.matrix[self.size] = np.rint(vec / scale)
+        else:
+            scale = 1.0
+            self.matrix[self.size] = vec
+        self.scales[self.size] = scale
+        self.ids[self.size] = memory_id
+        self.size += 1
+        return self.size - 1
+
+    def vector(self, row: int) -> np.ndarray:
+        return self.matrix[row].astype(np.float32) * self.scales[row]
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        if not self.quantized:
+            return self.matrix[:self.size] @ query
+        return (self.matrix[:self.size] @ query) * self.scales[:self.size]
+
+    def remove(self, row: int):
+        """Swap-removes row and returns the id that moved into it, if any."""
+        last = self.size - 1
+        self.size = last
+        if row == last:
+            return None
+        self.matrix[row] = self.matrix[last]
+        self.scales[row] = self.scales[last]
+        self.ids[row] = self.ids[last]
+        return int(self.ids[row])
+
+class IVFMemoryIndex(MemoryIndex):
+    """Inverted-file approximate index for large permanent_memory tables.
+
+    Vectors are clustered around nlist k-means centroids, and a query only
+    scores the entries of its nprobe nearest clusters. Clustered lists hold
+    int8-quantized vectors, so their scores are approximate (within about
+    0.01) even when every list is probed. Below min_train entries everything
+    sits in one float32 list and search is exact. Inserts and
+    deletes go straight into the clusters; the centroids and cluster
+    assignments are saved to `path` so restarts skip training, and the
+    vectors themselves are reloaded from the database.
+    """
+
+    def __init__(self, path: str = GAIA_IVF_PATH, model: str = None, nprobe: int = GAIA_IVF_NPROBE,
+                 min_train: int = GAIA_IVF_MIN_TRAIN, nlist: int = GAIA_IVF_LISTS, seed: int = 0):
+        super().__init__()
+        self.path = path
+        self.model = model
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.nlist = nlist
+        self.rng = np.random.default_rng(seed)
+        self.dim: int = None
+        self.centroids: np.ndarray = None
+        self.lists: list[_InvertedList] = []
+        self.locations: dict[int, tuple[int, int]] = {}
+        self.trained_size = 0
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __contains__(self, memory_id):
+        return memory_id in self.locations
+
+    def load(self, rows):
+        self.entries.clear()
+        self.exact.clear()
+        self.exact_keys.clear()
+        self.locations.clear()
+        self.lists = []
+        self.centroids = None
+        self.dim = None
+
+        ids, vectors = [], []
+        for memory_id, keyword, answer, embedding in rows:
+            vec = normalize_vector(embedding)
+            if self.dim is None:
+                self.dim = vec.shape[0]
+            elif vec.shape[0] != self.dim:
+                print(f"Skipping memory {memory_id}: embedding has {vec.shape[0]} dimensions, index expects {self.dim}.")
+                continue
+            self.entries[memory_id] = (keyword, answer)
+            self.add_alias(keyword, memory_id)
+            ids.append(memory_id)
+            vectors.append(vec)
+        if not ids:
+            return
+
+        matrix = np.stack(vectors)
+        assignment = self._load_assignment(ids, matrix)
+        if assignment is None:
+            self._train(matrix)
+            assignment = nearest_centroids(matrix, self.centroids) if self.centroids is not None else np.zeros(len(ids), dtype=np.int32)
+            self.dirty = True
+        self._fill(ids, matrix, assignment)
+        if self.dirty:
+            self.save()
+
+    def _load_assignment(self, ids: list[int], matrix: np.ndarray):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as saved:
+                if int(saved["dim"]) != self.dim or str(saved["model"]) != str(self.model):
+                    print("Saved IVF index was built for another embedding model; rebuilding.")
+                    return None
+                trained_size = int(saved["trained_size"])
+                if not trained_size and len(ids) >= self.min_train:
+                    return None
+                if trained_size and len(ids) > trained_size * RETRAIN_GROWTH:
+                    print(f"Memory index grew from {trained_size} to {len(ids)} entries; retraining IVF centroids.")
+                    return None
+                centroids = saved["centroids"] if trained_size else None
+                known = dict(zip(saved["ids"].tolist(), saved["lists"].tolist()))
+        except Exception as e:
+            print(f"Could not read IVF index from {self.path}: {e}. Rebuilding.")
+            return None
+
+        self.centroids = centroids
+        self.trained_size = trained_size
+        missing = [i for i, memory_id in enumerate(ids) if memory_id not in known]
+        assignment = np.array([known.get(memory_id, 0) for memory_id in ids], dtype=np.int32)
+        if missing and centroids is not None:
+            # Rows added since the last save (e.g. after a crash) join their nearest list.
+            assignment[missing] = nearest_centroids(matrix[missing], centroids)
+        self.dirty = bool(missing)
+        return assignment
+
+    def _train(self, matrix: np.ndarray):
+        if len(matrix) < self.min_train:
+            self.centroids = None
+            self.trained_size = 0
+            return
+        nlist = self.nlist or max(1, int(2 * np.sqrt(len(matrix))))
+        nlist = min(nlist, len(matrix))
+        print(f"Training IVF memory index: {len(matrix)} entries into {nlist} lists...")
+        self.centroids = train_centroids(matrix, nlist, self.rng)
+        self.trained_size = len(matrix)
+
+    def _fill(self, ids: list[int], matrix: np.ndarray, assignment: np.ndarray):
+        trained = self.centroids is not None
+        self.lists = [_InvertedList(self.dim, quantized=trained) for _ in range(len(self.centroids) if trained else 1)]
+        for memory_id, vec, list_no in zip(ids, matrix, assignment.tolist()):
+            self.locations[memory_id] = (list_no, self.lists[list_no].append(memory_id, vec))
+
+    def retrain(self):
+        """Re-clusters every entry; call after large imports."""
+        ids = list(self.locations)
+        if not ids:
+            return
+        matrix = np.stack([self._vector(memory_id) for memory_id in ids])
+        self.locations.clear()
+        self._train(matrix)
+        assignment = nearest_centroids(matrix, self.centroids) if self.centroids is not None else np.zeros(len(ids), dtype=np.int32)
+        self._fill(ids, matrix, assignment)
+        self.dirty = True
+        self.save()
+
+    def _vector(self, memory_id: int) -> np.ndarray:
+        list_no, row = self.locations[memory_id]
+        return self.lists[list_no].vector(row)
+
+    def add(self, memory_id: int, keyword: str, answer: str, embedding):
+        vec = normalize_vector(embedding)
+        if self.dim is not None and vec.shape[0] != self.dim:
+            print(f"Skipping memory {memory_id}: embedding has {vec.shape[0]} dimensions, index expects {self.dim}.")
+            return
+        if self.dim is None:
+            self.dim = vec.shape[0]
+            self.lists = [_InvertedList(self.dim, quantized=False)]
+        if memory_id in self.locations:
+            self._remove_vector(memory_id)
+        else:
+            self.add_alias(keyword, memory_id)
+        self.entries[memory_id] = (keyword, answer)
+        list_no = int(np.argmax(self.centroids @ vec)) if self.centroids is not None else 0
+        self.locations[memory_id] = (list_no, self.lists[list_no].append(memory_id, vec))
+        self.dirty = True
+        if self.centroids is None and len(self.locations) >= self.min_train:
+            self.retrain()
+
+    def _remove_vector(self, memory_id: int):
+        list_no, row = self.locations.pop(memory_id)
+        moved_id = self.lists[list_no].remove(row)
+        if moved_id is not None:
+            self.locations[moved_id] = (list_no, row)
+
+    def remove(self, memory_id: int) -> bool:
+        if memory_id not in self.locations:
+            return False
+        self._remove_vector(memory_id)
+        self.entries.pop(memory_id, None)
+        for key in self.exact_keys.pop(memory_id, []):
+            if self.exact.get(key) == memory_id:
+                del self.exact[key]
+        self.dirty = True
+        return True
+
+    def search(self, query, k: int = 1, nprobe: int = None) -> list[tuple[int, str, str, float]]:
+        if not self.locations:
+            return []
+        q = normalize_vector(query)
+        if q.shape[0] != self.dim:
+            return []
+
+        if self.centroids is None:
+            probed = [0]
+        else:
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            centroid_scores = self.centroids @ q
+            probed = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+
+        ids, scores = [], []
+        for list_no in probed:
+            inverted = self.lists[list_no]
+            if inverted.size:
+                ids.append(inverted.ids[:inverted.size])
+                scores.append(inverted.scores(q))
+        if not ids:
+            return []
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+
+        k = min(k, len(ids))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        results = []
+        for i in top:
+            memory_id = int(ids[i])
+            keyword, answer = self.entries[memory_id]
+            results.append((memory_id, keyword, answer, float(scores[i])))
+        return results
+
+    def save(self):
+        if not self.path or not self.dirty or self.dim is None:
+            return
+        ids = np.fromiter(self.locations.keys(), dtype=np.int64, count=len(self.locations))
+        lists = np.fromiter((list_no for list_no, _ in self.locations.values()), dtype=np.int32, count=len(self.locations))
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                dim=self.dim,
+                model=str(self.model),
+                trained_size=self.trained_size,
+                centroids=self.centroids if self.centroids is not None else np.zeros((0, self.dim), dtype=np.float32),
+                ids=ids,
+                lists=lists,
+            )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+def guild_index_path(guild_id: int, path: str = GAIA_IVF_PATH) -> str:
+    # bot_memory.ivf.npz -> bot_memory.ivf.<guild_id>.npz
+    root, ext = os.path.splitext(path)
+    return f"{root}.{guild_id}{ext}"
+
+def create_memory_index(backend: str = GAIA_MEMORY_INDEX, model: str = None, path: str = GAIA_IVF_PATH) -> MemoryIndex:
+    if backend == "ivf":
+        return IVFMemoryIndex(path=path, model=model)
+    if backend != "exact":
+        print(f"Unknown GAIA_MEMORY_INDEX '{backend}', using the exact index.")
+    return MemoryIndex()
@@ -0,0 +1,146 @@
+import re
+import numpy as np
+
+INITIAL_CAPACITY = 64
+EMBEDDING_DTYPE = np.float32
+
+def pack_embedding(embedding) -> bytes:
+    return np.asarray(embedding, dtype=EMBEDDING_DTYPE).tobytes()
+
+def unpack_embedding(blob: bytes) -> np.ndarray:
+    # Read-only view straight over the BLOB, no copy.
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+def normalize_keyword(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def normalize_vector(vector) -> np.ndarray:
+    vec = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        return vec
+    return vec / norm
+
+class MemoryIndex:
+    """Resident copy of permanent_memory for semantic lookup.
+
+    Embeddings live pre-normalized in one float32 matrix, so a query is a
+    single matrix-vector product. Rows are appended into spare capacity and
+    removed by swapping in the last row, so !remember/!forgetmemory never
+    rebuild the whole matrix. Keywords and aliases are also hashed by their
+    normalized text, so exact hits skip the embedding call altogether.
+    """
+
+    def __init__(self):
+        self.matrix: np.ndarray = None
+        self.row_ids: np.ndarray = None
+        self.size = 0
+        self.positions: dict[int, int] = {}
+        self.entries: dict[int, tuple[str, str]] = {}
+        self.exact: dict[str, int] = {}
+        self.exact_keys: dict[int, list[str]] = {}
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, memory_id):
+        return memory_id in self.positions
+
+    def load(self, rows):
+        self.matrix = None
+        self.row_ids = None
+        self.size = 0
+        self.positions.clear()
+        self.entries.clear()
+        self.exact.clear()
+        self.exact_keys.clear()
+        for memory_id, keyword, answer, embedding in rows:
+            self.add(memory_id, keyword, answer, embedding)
+
+    def load_aliases(self, aliases):
+        for alias, memory_id in aliases:
+            self.add_alias(alias, memory_id)
+
+    def add_alias(self, alias: str, memory_id: int):
+        key = normalize_keyword(alias)
+        if key and key not in self.exact:
+            self.exact[key] = memory_id
+            self.exact_keys.setdefault(memory_id, []).append(key)
+
+    def lookup_exact(self, text: str):
+        memory_id = self.exact.get(normalize_keyword(text))
+        if memory_id is None or memory_id not in self.entries:
+            return None
+        keyword, answer = self.entries[memory_id]
+        return memory_id, keyword, answer
+
+    def _ensure_capacity(self, dim: int):
+        if self.matrix is None:
+            self.matrix = np.zeros((INITIAL_CAPACITY, dim), dtype=np.float32)
+            self.row_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        elif self.size == self.matrix.shape[0]:
+            new_capacity = self.matrix.shape[0] * 2
+            matrix = np.zeros((new_capacity, dim), dtype=np.float32)
+            matrix[:self.size] = self.matrix[:self.size]
+            row_ids = np.zeros(new_capacity, dtype=np.int64)
+            row_ids[:self.size] = self.row_ids[:self.size]
+            self.matrix = matrix
+            self.row_ids = row_ids
+
+    def add(self, memory_id: int, keyword: str, answer: str, embedding):
+        vec = normalize_vector(embedding)
+        if self.matrix is not None and vec.shape[0] != self.matrix.shape[1]:
+            print(f"Skipping memory {memory_id}: embedding has {vec.shape[0]} dimensions, index expects {self.matrix.shape[1]}.")
+            return
+        if memory_id in self.positions:
+            self.matrix[self.positions[memory_id]] = vec
+            self.entries[memory_id] = (keyword, answer)
+            return
+        self._ensure_capacity(vec.shape[0])
+        self.matrix[self.size] = vec
+        self.row_ids[self.size] = memory_id
+        self.positions[memory_id] = self.size
+        self.entries[memory_id] = (keyword, answer)
+        self.add_alias(keyword, memory_id)
+        self.size += 1
+
+    def remove(self, memory_id: int) -> bool:
+        row = self.positions.pop(memory_id, None)
+        if row is None:
+            return False
+        self.entries.pop(memory_id, None)
+        for key in self.exact_keys.pop(memory_id, []):
+            if self.exact.get(key) == memory_id:
+                del self.exact[key]
+        last = self.size - 1
+        if row != last:
+            moved_id = int(self.row_ids[last])
+            self.matrix[row] = self.matrix[last]
+            self.row_ids[row] = moved_id
+            self.positions[moved_id] = row
+        self.size = last
+        return True
+
+    def save(self):
+        # Nothing to persist: the exact index is rebuilt from the database.
+        pass
+
+    def search(self, query, k: int = 1) -> list[tuple[int, str, str, float]]:
+        if self.size == 0:
+            return []
+        q = normalize_vector(query)
+        if q.shape[0] != self.matrix.shape[1]:
+            return []
+        scores = self.matrix[:self.size] @ q
+        k = min(k, self.size)
+        if k == 1:
+            top = [int(np.argmax(scores))]
+        else:
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+        results = []
+        for row in top:
+            memory_id = int(self.row_ids[row])
+            keyword, answer = self.entries[memory_id]
+            results.append((memory_id, keyword, answer, float(scores[row])))
+        return results
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sqlite3
+from dotenv import load_dotenv
+from Utilities.gaia_client import create_embeddings
+from Utilities.memory_index import pack_embedding
+
+load_dotenv()
+MEMORY_REEMBED_BATCH_SIZE = int(os.getenv("MEMORY_REEMBED_BATCH_SIZE", "32"))
+MEMORY_REEMBED_INTERVAL = float(os.getenv("MEMORY_REEMBED_INTERVAL", "1.0"))
+MAX_RETRY_DELAY = 300
+
+class MemoryReembedder:
+    """Background job that moves permanent_memory rows onto the current embedding model.
+
+    Rows are picked in id order by their embedding_model column, so progress
+    lives in the database and a restart simply carries on with whatever is
+    still stale. Between batches the job sleeps for `interval` seconds, and
+    it waits while is_busy() reports live AI traffic. on_migrated receives
+    (memory_id, guild_id, keyword, answer, embedding, old_model) for every row moved.
+    """
+
+    def __init__(self, db_path: str, model: str, on_migrated, is_busy=None,
+                 batch_size: int = MEMORY_REEMBED_BATCH_SIZE, interval: float = MEMORY_REEMBED_INTERVAL):
+        self.db_path = db_path
+        self.model = model
+        self.on_migrated = on_migrated
+        self.is_busy = is_busy or (lambda: False)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.task: asyncio.Task = None
+        self.migrated = 0
+        self.remaining = 0
+
+    def _count_stale(self) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT COUNT(*) FROM permanent_memory WHERE embedding_model != ?', (self.model,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def _stale_batch(self) -> list[tuple[int, int, str, str, str]]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(
+                'SELECT id, guild_id, keyword, answer, embedding_model FROM permanent_memory WHERE embedding_model != ? ORDER BY id LIMIT ?',
+                (self.model, self.batch_size)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def _store(self, rows, vectors) -> list[tuple]:
+        conn = sqlite3.connect(self.db_path)
+        stored = []
+        try:
+            with conn:
+                for (memory_id, guild_id, keyword, answer, old_model), embedding in zip(rows, vectors):
+                    # Skips rows deleted or changed since the batch was read.
+                    cursor = conn.execute(
+                        'UPDATE permanent_memory SET embedding = ?, embedding_dim = ?, embedding_model = ? WHERE id = ? AND embedding_model = ?',
+                        (pack_embedding(embedding), len(embedding), self.model, memory_id, old_model)
+                    )
+                    if cursor.rowcount:
+                        stored.append((memory_id, guild_id, keyword, answer, embedding, old_model))
+        finally:
+            conn.close()
+        return stored
+
+    async def run(self):
+        self.remaining = await asyncio.to_thread(self._count_stale)
+        if not self.remaining:
+            return
+        print(f"Re-embedding {self.remaining} permanent memories with {self.model}...")
+        retry_delay = self.interval
+        while True:
+            while self.is_busy():
+                await asyncio.sleep(self.interval)
+            try:
+                rows = await asyncio.to_thread(self._stale_batch)
+                if not rows:
+                    break
+                vectors = await create_embeddings([keyword for _, _, keyword, _, _ in rows], model=self.model)
+                stored = await asyncio.to_thread(self._store, rows, vectors)
+            except Exception as e:
+                print(f"Error re-embedding permanent memories: {e}. Retrying in {retry_delay:.0f}s.")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+                continue
+
+            retry_delay = self.interval
+            for row in stored:
+                self.on_migrated(*row)
+            self.migrated += len(stored)
+            self.remaining = max(self.remaining - len(rows), 0)
+            await asyncio.sleep(self.interval)
+        self.remaining = 0
+        print(f"Re-embedding finished: {self.migrated} permanent memories now use {self.model}.")
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "migrated": self.migrated,
+            "remaining": self.remaining,
+        }
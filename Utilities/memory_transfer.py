@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+
+EXPORT_FORMATS = ("jsonl", "csv")
+CSV_FIELDS = ["keyword", "answer", "aliases"]
+
+class MemoryRecord:
+    __slots__ = ("keyword", "answer", "aliases")
+
+    def __init__(self, keyword: str, answer: str, aliases: list[str]):
+        self.keyword = keyword
+        self.answer = answer
+        self.aliases = aliases
+
+def _split_aliases(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(alias).strip() for alias in value if str(alias).strip()]
+
+def _record(keyword, answer, aliases) -> MemoryRecord:
+    keyword = str(keyword or "").strip()
+    answer = str(answer or "").strip()
+    if not keyword or not answer:
+        raise ValueError("keyword and answer are required")
+    return MemoryRecord(keyword, answer, _split_aliases(aliases))
+
+def parse_memory_file(data: bytes, filename: str) -> tuple[list[MemoryRecord], list[str]]:
+    """Parses a JSONL or CSV memory file into records plus per-line errors.
+
+    JSONL lines are objects with "keyword", "answer" and optional "aliases"
+    (a list or a comma-separated string). CSV files need a header row with
+    keyword and answer columns, plus an optional comma-separated aliases
+    column.
+    """
+    text = data.decode("utf-8-sig")
+    records, errors = [], []
+    if filename.lower().endswith(".csv"):
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or not {"keyword", "answer"} <= {name.strip().lower() for name in reader.fieldnames}:
+            return [], ["CSV header must include `keyword` and `answer` columns."]
+        for line_no, row in enumerate(reader, start=2):
+            row = {(key or "").strip().lower(): value for key, value in row.items()}
+            try:
+                records.append(_record(row.get("keyword"), row.get("answer"), row.get("aliases")))
+            except ValueError as e:
+                errors.append(f"line {line_no}: {e}")
+        return records, errors
+
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+            records.append(_record(row.get("keyword"), row.get("answer"), row.get("aliases")))
+        except ValueError as e:
+            errors.append(f"line {line_no}: {e}")
+    return records, errors
+
+def write_memory_export(rows, out, fmt: str) -> int:
+    """Writes (keyword, answer, aliases) rows to the text stream `out` one at a time."""
+    count = 0
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer:
+        writer.writerow(CSV_FIELDS)
+    for keyword, answer, aliases in rows:
+        alias_list = aliases.split("\x1f") if aliases else []
+        if writer:
+            writer.writerow([keyword, answer, ", ".join(alias_list)])
+        else:
+            out.write(json.dumps({"keyword": keyword, "answer": answer, "aliases": alias_list}, ensure_ascii=False) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+QUESTION_DECK_DB = os.getenv("QUESTION_DECK_DB", "bot_data.db")
+QUESTION_DECK_RESIDENT = int(os.getenv("QUESTION_DECK_RESIDENT", "256"))
+
+def shuffled_order(size: int, seed: int) -> np.ndarray:
+    # Generator.permutation is a Fisher-Yates shuffle; the seed makes it reproducible.
+    dtype = np.int32 if size < 2**31 else np.int64
+    return np.random.default_rng(seed).permutation(size).astype(dtype, copy=False)
+
+class QuestionDeck:
+    """A shuffled order over a content pool plus a cursor into it.
+
+    Only (size, seed, cursor) are persisted: the order is rebuilt from the
+    seed on load, so saving a draw is one small row update whatever the
+    pool size.
+    """
+
+    __slots__ = ("size", "seed", "cursor", "order", "last_used")
+
+    def __init__(self, size: int, seed: int, cursor: int = 0):
+        self.size = size
+        self.seed = seed
+        self.cursor = cursor
+        self.order = shuffled_order(size, seed)
+        self.last_used = time.monotonic()
+
+    def draw(self) -> int:
+        index = int(self.order[self.cursor])
+        self.cursor += 1
+        return index
+
+    @property
+    def exhausted(self) -> bool:
+        return self.cursor >= self.size
+
+class QuestionDeckStore:
+    """Persistent decks keyed by game, channel and category.
+
+    draw() hands out every index of a pool once, in random order, before
+    any repeats. When a deck runs out, or the pool changes size, it is
+    reshuffled with a fresh seed. Decks are rebuilt from the database on
+    first use after a restart, and the least recently used are dropped
+    from memory past `resident` decks.
+    """
+
+    def __init__(self, db_path: str = QUESTION_DECK_DB, resident: int = QUESTION_DECK_RESIDENT):
+        self.db_path = db_path
+        self.resident = resident
+        self.decks: dict[str, QuestionDeck] = {}
+        self.conn: sqlite3.Connection = None
+        self.db_lock = threading.Lock()
+        self.lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS question_decks (
+                    deck_key TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    seed INTEGER NOT NULL,
+                    cursor INTEGER NOT NULL
+                )
+            ''')
+            self.conn.commit()
+        return self.conn
+
+    def _load(self, key: str, size: int) -> QuestionDeck:
+        with self.db_lock:
+            row = self._connect().execute('SELECT size, seed, cursor FROM question_decks WHERE deck_key = ?', (key,)).fetchone()
+        if row and row[0] == size:
+            return QuestionDeck(*row)
+        return QuestionDeck(size, secrets.randbits(63))
+
+    def _save(self, key: str, deck: QuestionDeck):
+        with self.db_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO question_decks (deck_key, size, seed, cursor) VALUES (?, ?, ?, ?)',
+                    (key, deck.size, deck.seed, deck.cursor)
+                )
+
+    def _evict(self):
+        while len(self.decks) > self.resident:
+            key = min(self.decks, key=lambda k: self.decks[k].last_used)
+            del self.decks[key]
+
+    async def draw(self, key: str, size: int) -> tuple[int, bool]:
+        """Returns (index, reshuffled) for the next item of a pool of `size`;
+        reshuffled is True when the deck had run out and started over."""
+        if size <= 0:
+            raise ValueError("cannot draw from an empty pool")
+        async with self.lock:
+            deck = self.decks.get(key)
+            if deck is None or deck.size != size:
+                deck = await asyncio.to_thread(self._load, key, size)
+                self.decks[key] = deck
+                self._evict()
+            reshuffled = deck.exhausted
+            if reshuffled:
+                deck = await asyncio.to_thread(QuestionDeck, size, secrets.randbits(63))
+                self.decks[key] = deck
+            deck.last_used = time.monotonic()
+            index = deck.draw()
+            await asyncio.to_thread(self._save, key, deck)
+            return index, reshuffled
+
+    def close(self):
+        with self.db_lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+question_decks = QuestionDeckStore()
@@ -0,0 +1,68 @@
+import asyncio
+
+class _Flight:
+    __slots__ = ("task", "deltas", "listeners")
+
+    def __init__(self):
+        self.task: asyncio.Future = None
+        self.deltas: list = []
+        self.listeners: list = []
+
+    def publish(self, delta):
+        self.deltas.append(delta)
+        for listener in list(self.listeners):
+            listener(delta)
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one pending call.
+
+    The first caller for a key starts the work; everyone else arriving while
+    it is in flight awaits the same result (or exception). The shared task
+    is shielded, so one caller giving up doesn't cancel it for the rest.
+
+    Callers that pass `on_delta` get streamed output: a flight started with
+    it calls `factory(publish)`, and every delta published is sent to all
+    callers waiting with an `on_delta`, late joiners first getting the
+    deltas they missed.
+    """
+
+    def __init__(self):
+        self.flights: dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory, on_delta=None):
+        flight = self.flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            if on_delta:
+                for delta in flight.deltas:
+                    on_delta(delta)
+        else:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(factory(flight.publish) if on_delta else factory())
+            self.flights[key] = flight
+            self.started += 1
+            flight.task.add_done_callback(lambda done: self._finish(key, flight))
+
+        if on_delta:
+            flight.listeners.append(on_delta)
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            if on_delta:
+                flight.listeners.remove(on_delta)
+
+    def _finish(self, key: str, flight: _Flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved when nobody is left awaiting it.
+            flight.task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self.flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
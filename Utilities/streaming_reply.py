@@ -0,0 +1,166 @@
+import asyncio
+import os
+import time
+from collections import deque
+import discord
+from dotenv import load_dotenv
+
+load_dotenv()
+DISCORD_MESSAGE_LIMIT = 2000
+# Minimum spacing between one reply's renders.
+STREAM_EDIT_INTERVAL = float(os.getenv("GAIA_STREAM_EDIT_INTERVAL", "1.2"))
+# Discord allows roughly 5 edits per 5 seconds per channel; stay one under it.
+STREAM_CHANNEL_EDITS = int(os.getenv("GAIA_STREAM_CHANNEL_EDITS", "4"))
+STREAM_CHANNEL_WINDOW = float(os.getenv("GAIA_STREAM_CHANNEL_WINDOW", "5"))
+STREAM_PLACEHOLDER = "💭 Thinking..."
+
+def split_message(text: str, limit: int = DISCORD_MESSAGE_LIMIT) -> list[str]:
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n ")
+    chunks.append(text)
+    return chunks
+
+class ChannelEditLimiter:
+    """Sliding-window limit on message writes per channel, shared by every
+    StreamingReply in that channel. Waiters are served in arrival order."""
+
+    def __init__(self, max_edits: int = STREAM_CHANNEL_EDITS, window: float = STREAM_CHANNEL_WINDOW):
+        self.max_edits = max_edits
+        self.window = window
+        self.sent: dict[int, deque[float]] = {}
+        self.locks: dict[int, asyncio.Lock] = {}
+
+    async def acquire(self, channel_id: int):
+        lock = self.locks.setdefault(channel_id, asyncio.Lock())
+        async with lock:
+            sent = self.sent.setdefault(channel_id, deque())
+            while True:
+                now = time.monotonic()
+                while sent and sent[0] <= now - self.window:
+                    sent.popleft()
+                if len(sent) < self.max_edits:
+                    break
+                await asyncio.sleep(sent[0] + self.window - now)
+            sent.append(now)
+        if not lock.locked() and len(self.locks) > 1024:
+            self._prune()
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window
+        for channel_id, sent in list(self.sent.items()):
+            lock = self.locks.get(channel_id)
+            if (not sent or sent[-1] <= cutoff) and (lock is None or not lock.locked()):
+                self.sent.pop(channel_id, None)
+                self.locks.pop(channel_id, None)
+
+channel_edit_limiter = ChannelEditLimiter()
+
+class StreamingReply:
+    """Posts a placeholder and keeps it updated while tokens stream in.
+
+    Deltas are only buffered by push(); a background task renders the first
+    token as soon as it arrives, then coalesces the rest into at most one
+    round of edits every STREAM_EDIT_INTERVAL seconds, rolling over into new
+    messages past Discord's 2000 character limit. Every write also waits on
+    the channel's shared ChannelEditLimiter, so concurrent replies in one
+    channel together stay inside Discord's per-channel edit limit; while a
+    reply waits its buffer keeps growing, which coalesces the edits.
+    """
+
+    def __init__(self, send_first, channel: discord.abc.Messageable, interval: float = STREAM_EDIT_INTERVAL,
+                 limiter: ChannelEditLimiter = channel_edit_limiter):
+        self.send_first = send_first
+        self.channel = channel
+        self.interval = interval
+        self.limiter = limiter
+        self.buffer = ""
+        self.messages: list[discord.Message] = []
+        self.rendered: list[str] = []
+        self.dirty = asyncio.Event()
+        self.render_lock = asyncio.Lock()
+        self.flush_task: asyncio.Task = None
+
+    async def start(self):
+        await self.limiter.acquire(self.channel.id)
+        try:
+            first = await self.send_first(STREAM_PLACEHOLDER)
+            self.messages.append(first)
+            self.rendered.append(STREAM_PLACEHOLDER)
+        except discord.HTTPException as e:
+            # Without a placeholder the first render posts a new message instead.
+            print(f"Error sending streamed reply placeholder: {e}")
+        self.flush_task = asyncio.create_task(self._flush_loop())
+
+    def push(self, delta: str):
+        self.buffer += delta
+        self.dirty.set()
+
+    async def finish(self, final_text: str):
+        if self.flush_task:
+            # Only cancel between renders so a half-sent overflow message is never lost.
+            async with self.render_lock:
+                self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+        self.buffer = final_text or ""
+        try:
+            await self._render()
+        except discord.HTTPException as e:
+            print(f"Error finishing streamed reply, sending it as new messages: {e}")
+            await self._send_fallback()
+            return
+        if not self.buffer.strip():
+            return
+        # A final text shorter than what was streamed leaves overflow messages behind.
+        chunk_count = len(split_message(self.buffer))
+        for message in self.messages[chunk_count:]:
+            try:
+                await self.limiter.acquire(self.channel.id)
+                await message.delete()
+            except discord.HTTPException as e:
+                print(f"Error deleting stale streamed reply message: {e}")
+        del self.messages[chunk_count:]
+        del self.rendered[chunk_count:]
+
+    async def _send_fallback(self):
+        for chunk in split_message(self.buffer):
+            try:
+                await self.limiter.acquire(self.channel.id)
+                await self.channel.send(chunk)
+            except discord.HTTPException as e:
+                print(f"Error sending streamed reply fallback: {e}")
+                return
+
+    async def _flush_loop(self):
+        while True:
+            await self.dirty.wait()
+            self.dirty.clear()
+            try:
+                async with self.render_lock:
+                    await self._render()
+            except discord.HTTPException as e:
+                print(f"Error updating streamed reply: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _render(self):
+        if not self.buffer.strip():
+            return
+        for i, chunk in enumerate(split_message(self.buffer)):
+            if i < len(self.messages):
+                if self.rendered[i] != chunk:
+                    await self.limiter.acquire(self.channel.id)
+                    await self.messages[i].edit(content=chunk)
+                    self.rendered[i] = chunk
+            else:
+                await self.limiter.acquire(self.channel.id)
+                self.messages.append(await self.channel.send(chunk))
+                self.rendered.append(chunk)
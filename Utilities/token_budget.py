@@ -0,0 +1,39 @@
+import math
+import re
+
+# Rough per-message cost of the chat template (role markers, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    # No tokenizer ships with the bot, so take the larger of two common
+    # approximations: ~4 characters per token and ~1.3 tokens per word.
+    pieces = len(_TOKEN_PATTERN.findall(text))
+    return max(math.ceil(len(text) / 4), math.ceil(pieces * 1.3), 1)
+
+def message_tokens(message: dict) -> int:
+    # Counted once and cached on the message, so it is stored with the history.
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = estimate_tokens(message["content"] or "") + MESSAGE_OVERHEAD_TOKENS
+        message["tokens"] = tokens
+    return tokens
+
+def select_history_window(history: list[dict], budget: int) -> tuple[list[dict], list[dict]]:
+    """Splits history into (older, window) where window is the newest run of
+    messages that fits in budget tokens."""
+    used = 0
+    start = len(history)
+    for i in range(len(history) - 1, -1, -1):
+        tokens = message_tokens(history[i])
+        if used + tokens > budget:
+            break
+        used += tokens
+        start = i
+    # Don't open the window on an assistant reply whose question was cut off.
+    while start < len(history) and history[start]["role"] == "assistant":
+        start += 1
+    return history[:start], history[start:]
+
+def to_api_message(message: dict) -> dict:
+    return {"role": message["role"], "content": message["content"]}
@@ -0,0 +1,235 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from dotenv import load_dotenv
+from Utilities.gaia_client import GAIANET_EMBEDDING_MODEL
+from Utilities.embedding_cache import get_embedding
+from Utilities.memory_index import INITIAL_CAPACITY, normalize_keyword, normalize_vector, pack_embedding, unpack_embedding
+
+load_dotenv()
+WYR_HISTORY_DB = os.getenv("WYR_HISTORY_DB", "bot_memory.db")
+WYR_HISTORY_GAMES = int(os.getenv("WYR_HISTORY_GAMES", "10"))
+WYR_HISTORY_SIMILARITY = float(os.getenv("WYR_HISTORY_SIMILARITY", "0.9"))
+WYR_HISTORY_RESIDENT_GUILDS = int(os.getenv("WYR_HISTORY_RESIDENT_GUILDS", "100"))
+
+def question_text(option_A: str, option_B: str) -> str:
+    return f"{option_A} OR {option_B}"
+
+class GuildQuestionWindow:
+    """Questions one guild was asked in its last N games.
+
+    Embeddings sit pre-normalized in a growable float32 matrix, so a
+    near-duplicate check is one matrix-vector product over the window, and
+    normalized texts are kept in a set for exact repeats (local questions
+    are recorded before their embedding is known).
+    """
+
+    __slots__ = ("matrix", "game_ids", "size", "texts", "last_used")
+
+    def __init__(self):
+        self.matrix: np.ndarray = None
+        self.game_ids: np.ndarray = None
+        self.size = 0
+        self.texts: dict[str, int] = {}
+        self.last_used = time.monotonic()
+
+    def add(self, game_id: int, text: str, embedding=None):
+        key = normalize_keyword(text)
+        self.texts[key] = max(game_id, self.texts.get(key, 0))
+        if embedding is None:
+            return
+        vector = normalize_vector(embedding)
+        if self.matrix is None or self.matrix.shape[1] != len(vector):
+            self.matrix = np.zeros((INITIAL_CAPACITY, len(vector)), dtype=np.float32)
+            self.game_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+            self.size = 0
+        elif self.size == len(self.matrix):
+            self.matrix = np.concatenate((self.matrix, np.zeros_like(self.matrix)))
+            self.game_ids = np.concatenate((self.game_ids, np.zeros_like(self.game_ids)))
+        self.matrix[self.size] = vector
+        self.game_ids[self.size] = game_id
+        self.size += 1
+
+    def trim(self, oldest_game_id: int):
+        self.texts = {key: game_id for key, game_id in self.texts.items() if game_id >= oldest_game_id}
+        if not self.size:
+            return
+        keep = self.game_ids[:self.size] >= oldest_game_id
+        kept = int(keep.sum())
+        self.matrix[:kept] = self.matrix[:self.size][keep]
+        self.game_ids[:kept] = self.game_ids[:self.size][keep]
+        self.size = kept
+
+    def contains_text(self, text: str) -> bool:
+        return normalize_keyword(text) in self.texts
+
+    def best_similarity(self, embedding) -> float:
+        if not self.size:
+            return 0.0
+        vector = normalize_vector(embedding)
+        if len(vector) != self.matrix.shape[1]:
+            return 0.0
+        return float((self.matrix[:self.size] @ vector).max())
+
+class WyrQuestionHistory:
+    """Persistent per-guild record of asked WYR questions.
+
+    Every game gets a row in wyr_games and every question it showed a row in
+    wyr_asked, keyed by guild and game. Only a guild's last `games` games are
+    kept, both on disk and in the resident GuildQuestionWindow, so checking
+    a candidate costs the same no matter how many games have been played.
+    Windows are loaded on a guild's first game and the least recently used
+    ones are dropped past `resident_guilds`.
+    """
+
+    def __init__(self, db_path: str = WYR_HISTORY_DB, games: int = WYR_HISTORY_GAMES,
+                 similarity_threshold: float = WYR_HISTORY_SIMILARITY, resident_guilds: int = WYR_HISTORY_RESIDENT_GUILDS,
+                 model: str = GAIANET_EMBEDDING_MODEL):
+        self.db_path = db_path
+        self.games = games
+        self.similarity_threshold = similarity_threshold
+        self.resident_guilds = resident_guilds
+        self.model = model
+        self.windows: dict[int, GuildQuestionWindow] = {}
+        self.conn: sqlite3.Connection = None
+        self.db_lock = threading.Lock()
+        self.rejected = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS wyr_games (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id INTEGER NOT NULL,
+                    started_at REAL NOT NULL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS wyr_asked (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id INTEGER NOT NULL,
+                    game_id INTEGER NOT NULL,
+                    question TEXT NOT NULL,
+                    embedding BLOB,
+                    embedding_model TEXT
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_wyr_games_guild_id ON wyr_games (guild_id, id)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_wyr_asked_guild_game ON wyr_asked (guild_id, game_id)')
+            self.conn.commit()
+        return self.conn
+
+    def _start_game(self, guild_id: int) -> tuple[int, int]:
+        with self.db_lock:
+            conn = self._connect()
+            with conn:
+                game_id = conn.execute('INSERT INTO wyr_games (guild_id, started_at) VALUES (?, ?)', (guild_id, time.time())).lastrowid
+                row = conn.execute(
+                    'SELECT id FROM wyr_games WHERE guild_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?',
+                    (guild_id, self.games - 1)
+                ).fetchone()
+                oldest_game_id = row[0] if row else 0
+                conn.execute('DELETE FROM wyr_asked WHERE guild_id = ? AND game_id < ?', (guild_id, oldest_game_id))
+                conn.execute('DELETE FROM wyr_games WHERE guild_id = ? AND id < ?', (guild_id, oldest_game_id))
+        return game_id, oldest_game_id
+
+    def _load_window(self, guild_id: int) -> GuildQuestionWindow:
+        with self.db_lock:
+            rows = self._connect().execute(
+                'SELECT game_id, question, embedding, embedding_model FROM wyr_asked WHERE guild_id = ? ORDER BY id',
+                (guild_id,)
+            ).fetchall()
+        window = GuildQuestionWindow()
+        for game_id, question, blob, model in rows:
+            window.add(game_id, question, unpack_embedding(blob) if blob and model == self.model else None)
+        return window
+
+    def _insert(self, guild_id: int, game_id: int, text: str, embedding):
+        with self.db_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT INTO wyr_asked (guild_id, game_id, question, embedding, embedding_model) VALUES (?, ?, ?, ?, ?)',
+                    (guild_id, game_id, text, pack_embedding(embedding) if embedding is not None else None,
+                     self.model if embedding is not None else None)
+                )
+
+    def _evict(self):
+        while len(self.windows) > self.resident_guilds:
+            guild_id = min(self.windows, key=lambda gid: self.windows[gid].last_used)
+            del self.windows[guild_id]
+
+    async def _window(self, guild_id: int) -> GuildQuestionWindow:
+        window = self.windows.get(guild_id)
+        if window is None:
+            window = await asyncio.to_thread(self._load_window, guild_id)
+            window = self.windows.setdefault(guild_id, window)
+            self._evict()
+        window.last_used = time.monotonic()
+        return window
+
+    async def start_game(self, guild_id: int) -> int:
+        """Registers a new game for the guild, drops games that fell out of the window and returns the game id."""
+        game_id, oldest_game_id = await asyncio.to_thread(self._start_game, guild_id)
+        window = await self._window(guild_id)
+        window.trim(oldest_game_id)
+        return game_id
+
+    async def filter_recent(self, guild_id: int, questions: list[str]) -> list[str]:
+        """Drops questions asked word-for-word in the guild's recent games."""
+        window = await self._window(guild_id)
+        return [question for question in questions if not window.contains_text(question)]
+
+    async def check(self, guild_id: int, option_A: str, option_B: str):
+        """Returns (is_repeat, embedding) for a candidate question.
+
+        The embedding is passed back so record() doesn't fetch it again; it
+        is None when the embedding call failed, in which case only an exact
+        repeat is rejected.
+        """
+        text = question_text(option_A, option_B)
+        window = await self._window(guild_id)
+        if window.contains_text(text):
+            self.rejected += 1
+            return True, None
+        try:
+            embedding = await get_embedding(text)
+        except Exception as e:
+            print(f"Error embedding WYR question for history check: {e}")
+            return False, None
+        similarity = window.best_similarity(embedding)
+        if similarity >= self.similarity_threshold:
+            print(f"Rejected WYR question too close to a recent one (Similarity: {similarity:.2f}).")
+            self.rejected += 1
+            return True, embedding
+        return False, embedding
+
+    async def record(self, guild_id: int, game_id: int, option_A: str, option_B: str, embedding=None):
+        text = question_text(option_A, option_B)
+        if embedding is None:
+            try:
+                embedding = await get_embedding(text)
+            except Exception as e:
+                print(f"Error embedding WYR question for history: {e}")
+        window = await self._window(guild_id)
+        window.add(game_id, text, embedding)
+        await asyncio.to_thread(self._insert, guild_id, game_id, text, embedding)
+
+    def close(self):
+        with self.db_lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def stats(self) -> dict:
+        return {
+            "resident_guilds": len(self.windows),
+            "resident_questions": sum(len(window.texts) for window in self.windows.values()),
+            "rejected": self.rejected,
+        }
+
+wyr_question_history = WyrQuestionHistory()
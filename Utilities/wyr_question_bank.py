@@ -0,0 +1,74 @@
+import asyncio
+import os
+from collections import deque
+from dotenv import load_dotenv
+from Utilities.wyr_utils import generate_ai_wyr_question
+
+load_dotenv()
+WYR_QUESTION_BANK_SIZE = int(os.getenv("WYR_QUESTION_BANK_SIZE", "5"))
+# Pause after a failed generation attempt so an outage doesn't spin the producer.
+PRODUCER_RETRY_DELAY = 10
+
+class WyrQuestionBank:
+    """Buffer of validated AI-generated WYR questions.
+
+    A background producer keeps up to `size` (option_A, option_B) pairs that
+    already passed the option-similarity check, so a round can start with a
+    ready question instead of waiting on the LLM. refill() is cheap to call
+    and only starts the producer when it isn't already running.
+    """
+
+    def __init__(self, size: int = WYR_QUESTION_BANK_SIZE, max_retries: int = 3, similarity_threshold: float = 0.8):
+        self.size = size
+        self.max_retries = max_retries
+        self.similarity_threshold = similarity_threshold
+        self.questions: deque[tuple[str, str]] = deque()
+        self.producer: asyncio.Task = None
+        self.generated = 0
+        self.served = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.questions)
+
+    def refill(self):
+        if len(self.questions) < self.size and (self.producer is None or self.producer.done()):
+            self.producer = asyncio.create_task(self._produce())
+
+    async def _produce(self):
+        while len(self.questions) < self.size:
+            try:
+                options = await generate_ai_wyr_question(self.max_retries, self.similarity_threshold)
+            except Exception as e:
+                print(f"Error pre-generating WYR question: {e}")
+                options = None
+            if options is None:
+                await asyncio.sleep(PRODUCER_RETRY_DELAY)
+                continue
+            if options not in self.questions:
+                self.questions.append(options)
+                self.generated += 1
+
+    async def take(self):
+        """Returns a buffered question, or generates one inline if the bank is empty."""
+        if self.questions:
+            options = self.questions.popleft()
+            self.served += 1
+        else:
+            self.misses += 1
+            options = await generate_ai_wyr_question(self.max_retries, self.similarity_threshold)
+        self.refill()
+        return options
+
+    def stop(self):
+        if self.producer:
+            self.producer.cancel()
+            self.producer = None
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.questions),
+            "generated": self.generated,
+            "served": self.served,
+            "misses": self.misses,
+        }
@@ -1,33 +1,6 @@
-import asyncio
-import os
 import numpy as np
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-GAIANET_API_KEY = os.getenv("GAIANET_API_KEY")
-GAIANET_BASE_URL = os.getenv("GAIANET_BASE_URL")
-GAIANET_MODEL_NAME = os.getenv("GAIANET_MODEL_NAME")
-GAIANET_EMBEDDING_BASE_URL = os.getenv("GAIANET_EMBEDDING_EMBEDDING_BASE_URL", "https://qwen7b.gaia.domains/v1")
-GAIANET_EMBEDDING_MODEL = os.getenv("GAIANET_EMBEDDING_EMBEDDING_MODEL", "nomic-embed-text-v1.5.f16")
-
-gaia_client_utils = OpenAI(
-    base_url=GAIANET_BASE_URL,
-    api_key=GAIANET_API_KEY
-)
-
-gaia_embedding_client_utils = OpenAI(
-    base_url=GAIANET_EMBEDDING_BASE_URL,
-    api_key=GAIANET_API_KEY
-)
-
-async def get_embedding(text: str) -> list[float]:
-    response = await asyncio.to_thread(
-        gaia_embedding_client_utils.embeddings.create,
-        model=GAIANET_EMBEDDING_MODEL,
-        input=[text]
-    )
-    return response.data[0].embedding
+from Utilities.gaia_client import create_chat_completion
+from Utilities.embedding_cache import get_embeddings
 
 def calculate_cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     vec1_np = np.array(vec1)
@@ -42,11 +15,52 @@ def calculate_cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
 async def get_gaia_ai_response(prompt_text: str) -> str:
     system_message = {"role": "system", "content": "You are a creative AI assistant focused on generating fun 'Would You Rather' questions and witty explanations. Ensure your explanations are *extremely brief* and no more than two concise sentences."}
     messages_to_send = [system_message, {"role": "user", "content": prompt_text}]
-    response = await asyncio.to_thread(
-        gaia_client_utils.chat.completions.create,
-        model=GAIANET_MODEL_NAME,
-        messages=messages_to_send,
-        temperature=0.7,
-        max_tokens=100
-    )
+    response = await create_chat_completion(messages_to_send, temperature=0.7, max_tokens=100)
     return response.choices[0].message.content
+
+WYR_QUESTION_PROMPT = (
+    "Generate a **highly unique, diverse, and imaginative** 'Would You Rather' question. "
+    "Ensure the two options are **distinct, silly, and creative**, and not commonly seen. "
+    "Separate the options clearly with ' OR '. "
+    "Do not include any extra sentences, introductory phrases, or explanations. "
+    "Example: 'Have a tiny personal raincloud that only waters your plants OR be able to instantly learn any dance move perfectly?'"
+)
+
+def parse_wyr_question(raw_question: str):
+    if not raw_question or ' OR ' not in raw_question:
+        return None
+
+    parts = raw_question.split(' OR ', 1)
+    if len(parts) < 2:
+        return None
+
+    option_A = parts[0].strip()
+    option_B = parts[1].strip()
+
+    if option_A.startswith("Would you rather..."):
+        option_A = option_A[len("Would you rather..."):].strip()
+    if option_A.endswith("?") and not option_B.endswith("?"):
+        option_A = option_A[:-1].strip()
+    if option_B.endswith("?"):
+        option_B = option_B[:-1].strip()
+    return option_A, option_B
+
+async def generate_ai_wyr_question(max_retries: int = 3, similarity_threshold: float = 0.8):
+    """Asks GaiaNet for a new question and returns its (option_A, option_B),
+    or None if no attempt produced two sufficiently distinct options."""
+    for _ in range(max_retries):
+        options = parse_wyr_question(await get_gaia_ai_response(WYR_QUESTION_PROMPT))
+        if not options:
+            continue
+
+        try:
+            embedding_A, embedding_B = await get_embeddings(list(options))
+            similarity = calculate_cosine_similarity(embedding_A, embedding_B)
+        except Exception as e:
+            print(f"Error checking similarity: {e}. Retrying question generation.")
+            continue
+
+        if similarity < similarity_threshold:
+            return options
+        print(f"Generated options too similar (Similarity: {similarity:.2f}). Retrying...")
+    return None
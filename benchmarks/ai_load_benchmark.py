@@ -0,0 +1,137 @@
+"""Load benchmark for the AI paths, run against the local GaiaNet stub.
+
+Drives bot.get_gaia_ai_response (the mention / !askgaia path) and the WYR
+question generator at increasing concurrency and reports throughput and
+p50/p95/p99 latency per level. All databases are created in a temporary
+directory, so the bot's real memory and history are never touched.
+
+Usage:
+  python benchmarks/ai_load_benchmark.py --concurrency 1,8,32,128 --requests 200
+  python benchmarks/ai_load_benchmark.py --base-url http://127.0.0.1:8089/v1   # external stub
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gaia_stub_server import add_stub_arguments, stub_from_args
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    samples = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+    }
+
+async def run_level(concurrency: int, total: int, make_call):
+    """Runs total calls through concurrency workers; make_call(i) returns a
+    coroutine resolving to True on success."""
+    latencies = []
+    errors = 0
+    next_index = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in next_index:
+            start = time.perf_counter()
+            try:
+                ok = await make_call(i)
+            except Exception as e:
+                print(f"Benchmark call failed: {e}")
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+def print_report(title: str, rows: list[tuple[int, dict]]):
+    print(f"\n{title}")
+    print(f"{'conc':>6} {'reqs':>6} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for concurrency, result in rows:
+        print(
+            f"{concurrency:>6} {result['requests']:>6} {result['errors']:>7} {result['throughput']:>9.1f} "
+            f"{result['p50']:>9.1f} {result['p95']:>9.1f} {result['p99']:>9.1f}"
+        )
+
+async def main(args: argparse.Namespace):
+    runner = None
+    base_url = args.base_url
+    if base_url is None:
+        runner, base_url = await stub_from_args(args).start()
+        print(f"Started GaiaNet stub on {base_url}")
+
+    # The GaiaNet clients read their settings at import time, so point them at
+    # the stub and move into a scratch directory before importing the bot.
+    os.environ.update({
+        "GAIANET_API_KEY": "stub",
+        "GAIANET_BASE_URL": base_url,
+        "GAIANET_BASE_URLS": base_url,
+        "GAIANET_EMBEDDING_BASE_URL": base_url,
+        "GAIANET_EMBEDDING_BASE_URLS": base_url,
+        "GAIANET_MODEL_NAME": os.environ.get("GAIANET_MODEL_NAME", "stub-chat"),
+    })
+    os.chdir(tempfile.mkdtemp(prefix="gaia-bench-"))
+
+    import bot
+    import botresponses
+    from Utilities.gaia_client import close_gaia_client
+    from Utilities.embedding_cache import embedding_cache
+    from Utilities.wyr_utils import generate_ai_wyr_question
+
+    bot.init_db()
+    failures = {botresponses.GAIANET_ERROR, botresponses.ERROR_GENERIC}
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    async def ask(level: int, i: int) -> bool:
+        # Every call is a distinct question in one of `level` channels, so the
+        # caches and request coalescing don't hide the endpoint latency.
+        prompt = f"Benchmark question {level}-{i}: what does a GaiaNet node do?"
+        reply = await bot.get_gaia_ai_response(
+            prompt, f"bench-{level}-{i % level}", on_delta=(lambda delta: None) if args.stream else None
+        )
+        return reply not in failures
+
+    async def wyr(level: int, i: int) -> bool:
+        return await generate_ai_wyr_question() is not None
+
+    try:
+        ask_rows = []
+        for level in levels:
+            ask_rows.append((level, await run_level(level, args.requests, lambda i, level=level: ask(level, i))))
+        print_report(f"get_gaia_ai_response ({'streaming' if args.stream else 'non-streaming'})", ask_rows)
+
+        wyr_rows = []
+        for level in levels:
+            wyr_rows.append((level, await run_level(level, args.wyr_requests, lambda i, level=level: wyr(level, i))))
+        print_report("generate_ai_wyr_question", wyr_rows)
+    finally:
+        await bot.chat_history_store.close()
+        await close_gaia_client()
+        embedding_cache.close()
+        if runner:
+            await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=200, help="get_gaia_ai_response calls per level.")
+    parser.add_argument("--wyr-requests", type=int, default=100, help="WYR generator calls per level.")
+    parser.add_argument("--stream", action="store_true", help="Benchmark the streaming reply path.")
+    parser.add_argument("--base-url", default=None, help="Use an already running stub instead of starting one.")
+    add_stub_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,210 @@
+"""Local stand-in for a GaiaNet node, for load tests that must not hit the real one.
+
+Serves the OpenAI-compatible endpoints the bot uses:
+  POST /v1/chat/completions  (plain and stream=true)
+  POST /v1/embeddings
+
+Latency, error rate and embedding size are configurable. Embeddings are a
+pure function of the input text, so similarity checks give the same result
+on every run.
+
+Usage:
+  python benchmarks/gaia_stub_server.py --port 8089 --chat-latency-ms 400 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import numpy as np
+from aiohttp import web
+
+WYR_MARKER = "Would You Rather"
+REPLY_WORDS = (
+    "gaia nodes serve open models so every community can run its own agent with private "
+    "knowledge and a public endpoint that speaks the same api as the big providers"
+).split()
+
+class LatencyModel:
+    """Draws per-request delays in seconds from a fixed, uniform or lognormal distribution."""
+
+    def __init__(self, median_ms: float, distribution: str = "lognormal", spread: float = 0.5, rng: random.Random = None):
+        self.median = median_ms / 1000
+        self.distribution = distribution
+        self.spread = spread
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.distribution == "fixed":
+            return self.median
+        if self.distribution == "uniform":
+            return self.rng.uniform(self.median * (1 - self.spread), self.median * (1 + self.spread))
+        return self.rng.lognormvariate(0, self.spread) * self.median
+
+def deterministic_embedding(text: str, dim: int) -> list[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.tolist()
+
+def fake_reply(prompt: str, words: int, rng: random.Random) -> str:
+    if WYR_MARKER in prompt:
+        tag = rng.randrange(1_000_000)
+        return f"Would you rather own a talking cactus #{tag} OR ride a bicycle made of jelly #{tag}?"
+    return " ".join(rng.choice(REPLY_WORDS) for _ in range(words)).capitalize() + "."
+
+class GaiaStubServer:
+    def __init__(self, chat_latency: LatencyModel, embedding_latency: LatencyModel, error_rate: float = 0.0,
+                 embedding_dim: int = 768, reply_words: int = 40, stream_chunk_delay_ms: float = 15, seed: int = None):
+        self.chat_latency = chat_latency
+        self.embedding_latency = embedding_latency
+        self.error_rate = error_rate
+        self.embedding_dim = embedding_dim
+        self.reply_words = reply_words
+        self.stream_chunk_delay = stream_chunk_delay_ms / 1000
+        self.rng = random.Random(seed)
+        self.counts = {"chat": 0, "stream": 0, "embeddings": 0, "embedded_texts": 0, "errors": 0}
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/v1/embeddings", self.embeddings)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    def _maybe_fail(self):
+        if self.rng.random() < self.error_rate:
+            self.counts["errors"] += 1
+            return web.json_response(
+                {"error": {"message": "Injected stub failure", "type": "server_error", "code": None}}, status=503
+            )
+        return None
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        await asyncio.sleep(self.chat_latency.sample())
+        failure = self._maybe_fail()
+        if failure:
+            return failure
+
+        prompt = body["messages"][-1]["content"]
+        content = fake_reply(prompt, self.reply_words, self.rng)
+        completion_id = f"chatcmpl-stub-{self.rng.randrange(1 << 32):08x}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            self.counts["chat"] += 1
+            prompt_tokens = sum(len(m["content"].split()) for m in body["messages"])
+            completion_tokens = len(content.split())
+            return web.json_response({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+            })
+
+        self.counts["stream"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+
+        async def send(delta: dict, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        await send({"role": "assistant", "content": ""})
+        for i, word in enumerate(content.split(" ")):
+            if i and self.stream_chunk_delay:
+                await asyncio.sleep(self.stream_chunk_delay)
+            await send({"content": word if i == 0 else " " + word})
+        await send({}, finish_reason="stop")
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        texts = body["input"]
+        if isinstance(texts, str):
+            texts = [texts]
+        await asyncio.sleep(self.embedding_latency.sample())
+        failure = self._maybe_fail()
+        if failure:
+            return failure
+
+        self.counts["embeddings"] += 1
+        self.counts["embedded_texts"] += len(texts)
+        tokens = sum(len(text.split()) for text in texts)
+        return web.json_response({
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": i, "embedding": deterministic_embedding(text, self.embedding_dim)}
+                for i, text in enumerate(texts)
+            ],
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.counts)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+        """Starts serving in the running event loop; returns the runner and its /v1 base URL."""
+        runner = web.AppRunner(self.make_app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound_host, bound_port = runner.addresses[0][:2]
+        return runner, f"http://{bound_host}:{bound_port}/v1"
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--chat-latency-ms", type=float, default=300, help="Median chat completion latency.")
+    parser.add_argument("--embedding-latency-ms", type=float, default=40, help="Median embeddings latency.")
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-spread", type=float, default=0.5, help="Lognormal sigma, or +/- fraction for uniform.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503.")
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--reply-words", type=int, default=40)
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=15)
+    parser.add_argument("--seed", type=int, default=None)
+
+def stub_from_args(args: argparse.Namespace) -> GaiaStubServer:
+    rng = random.Random(args.seed)
+    return GaiaStubServer(
+        chat_latency=LatencyModel(args.chat_latency_ms, args.latency_distribution, args.latency_spread, rng),
+        embedding_latency=LatencyModel(args.embedding_latency_ms, args.latency_distribution, args.latency_spread, rng),
+        error_rate=args.error_rate,
+        embedding_dim=args.embedding_dim,
+        reply_words=args.reply_words,
+        stream_chunk_delay_ms=args.stream_chunk_delay_ms,
+        seed=args.seed,
+    )
+
+async def serve_forever(args: argparse.Namespace):
+    runner, base_url = await stub_from_args(args).start(args.host, args.port)
+    print(f"GaiaNet stub listening on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_stub_arguments(parser)
+    try:
+        asyncio.run(serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
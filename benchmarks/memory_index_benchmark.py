@@ -0,0 +1,111 @@
+"""Recall and latency of the IVF memory index against the exact index.
+
+Builds both indexes over synthetic clustered embeddings (standing in for a
+FAQ corpus), queries them with paraphrase-like perturbations of stored
+entries plus unrelated questions, and reports for each nprobe:
+  recall@1         IVF top hit equals the exact top hit
+  threshold recall of the queries whose exact top hit clears the similarity
+                   threshold, the share where IVF returns that same hit
+  p50/p95 latency  per query, against the exact index's
+The last row probes every list ("all"): whatever recall it loses comes from
+the int8 quantization of trained lists, not from probing too few.
+
+Usage:
+  python benchmarks/memory_index_benchmark.py --size 100000 --nprobe 1,4,8,16,32 --threshold 0.75
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utilities.memory_index import MemoryIndex
+from Utilities.ivf_index import IVFMemoryIndex
+
+def make_corpus(size: int, dim: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    # Real embeddings cluster by topic; uniform noise would be a worst case no corpus looks like.
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, topics, size)] + 0.9 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def make_queries(corpus: np.ndarray, count: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    paraphrases = count * 3 // 4
+    picked = corpus[rng.integers(0, len(corpus), paraphrases)]
+    paraphrased = picked + noise * rng.standard_normal(picked.shape).astype(np.float32) / np.sqrt(corpus.shape[1])
+    unrelated = rng.standard_normal((count - paraphrases, corpus.shape[1])).astype(np.float32)
+    queries = np.concatenate((paraphrased, unrelated))
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+def timed_search(index, queries: np.ndarray, **kwargs):
+    hits, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results = index.search(query, k=1, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        hits.append(results[0] if results else None)
+    return hits, np.array(latencies) * 1000
+
+def main(args: argparse.Namespace):
+    rng = np.random.default_rng(args.seed)
+    print(f"Generating {args.size} x {args.dim} corpus and {args.queries} queries...")
+    corpus = make_corpus(args.size, args.dim, args.topics, rng)
+    queries = make_queries(corpus, args.queries, args.noise, rng)
+    rows = [(i + 1, f"keyword {i + 1}", f"answer {i + 1}", vector) for i, vector in enumerate(corpus)]
+
+    exact = MemoryIndex()
+    start = time.perf_counter()
+    exact.load(rows)
+    print(f"Exact index built in {time.perf_counter() - start:.1f}s")
+
+    path = os.path.join(tempfile.mkdtemp(prefix="gaia-ivf-"), "bench.ivf.npz")
+    ivf = IVFMemoryIndex(path=path, model="benchmark", nlist=args.nlist, seed=args.seed)
+    start = time.perf_counter()
+    ivf.load(rows)
+    print(f"IVF index built in {time.perf_counter() - start:.1f}s ({len(ivf.lists)} lists)")
+
+    reloaded = IVFMemoryIndex(path=path, model="benchmark", nlist=args.nlist, seed=args.seed)
+    start = time.perf_counter()
+    reloaded.load(rows)
+    print(f"IVF index reloaded from {os.path.basename(path)} in {time.perf_counter() - start:.1f}s")
+
+    exact_hits, exact_latency = timed_search(exact, queries)
+    confident = [i for i, hit in enumerate(exact_hits) if hit and hit[3] >= args.threshold]
+    print(f"{len(confident)}/{len(queries)} queries have an exact match at or above {args.threshold}")
+    print(f"\n{'nprobe':>7} {'recall@1':>9} {'thr recall':>11} {'p50 ms':>8} {'p95 ms':>8}")
+    print(f"{'exact':>7} {1:>9.3f} {1:>11.3f} {np.percentile(exact_latency, 50):>8.3f} {np.percentile(exact_latency, 95):>8.3f}")
+
+    recommended = None
+    probes = [int(n) for n in args.nprobe.split(",") if int(n) < len(ivf.lists)] + [len(ivf.lists)]
+    for nprobe in probes:
+        ivf_hits, ivf_latency = timed_search(ivf, queries, nprobe=nprobe)
+        same = [ivf_hit is not None and ivf_hit[0] == exact_hit[0] for ivf_hit, exact_hit in zip(ivf_hits, exact_hits)]
+        recall = sum(same) / len(same)
+        threshold_recall = sum(same[i] for i in confident) / len(confident) if confident else 1.0
+        print(
+            f"{'all' if nprobe == len(ivf.lists) else nprobe:>7} {recall:>9.3f} {threshold_recall:>11.3f} "
+            f"{np.percentile(ivf_latency, 50):>8.3f} {np.percentile(ivf_latency, 95):>8.3f}"
+        )
+        if recommended is None and threshold_recall >= args.target_recall:
+            recommended = nprobe
+
+    if recommended is None:
+        print(f"\nNo tested nprobe reached {args.target_recall:.0%} threshold recall; try larger values.")
+    else:
+        print(f"\nSmallest nprobe with >= {args.target_recall:.0%} threshold recall: GAIA_IVF_NPROBE={recommended}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=2000, help="Number of synthetic topic clusters.")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.6, help="Perturbation applied to paraphrase queries.")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists; 0 = 2 * sqrt(size).")
+    parser.add_argument("--threshold", type=float, default=0.75, help="SIMILARITY_THRESHOLD used by the bot.")
+    parser.add_argument("--target-recall", type=float, default=0.99)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -5,33 +5,44 @@ import botresponses
 import random
 import sqlite3
 import json
-import numpy as np
+import hashlib
+import tempfile
 from discord.ext import commands
-from openai import OpenAI
 from dotenv import load_dotenv
+from Utilities.gaia_client import GAIANET_EMBEDDING_MODEL, GAIANET_LEGACY_EMBEDDING_MODEL, chat_router, embedding_router, create_chat_completion, create_embeddings, stream_chat_completion, close_gaia_client
+from Utilities.embedding_cache import embedding_cache, embedding_flights, get_embedding
+from Utilities.embedding_batcher import embedding_batcher
+from Utilities.answer_cache import GAIA_ANSWER_CACHE_ENABLED, answer_cache
+from Utilities.chat_history_store import ChatHistoryStore
+from Utilities.token_budget import message_tokens, select_history_window, to_api_message
+from Utilities.single_flight import SingleFlight
+from Utilities.streaming_reply import StreamingReply, split_message
+from Utilities.ai_scheduler import SchedulerOverloaded, ai_scheduler
+from Utilities.ivf_index import create_memory_index, guild_index_path
+from Utilities.guild_memory import GuildMemoryRegistry
+from Utilities.memory_index import normalize_keyword, pack_embedding, unpack_embedding
+from Utilities.memory_reembed import MemoryReembedder
+from Utilities.memory_transfer import EXPORT_FORMATS, parse_memory_file, write_memory_export
+from Utilities.wyr_history import wyr_question_history
+from Utilities.question_deck import question_decks
+from Utilities.content_packs import content_packs
 
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 GUILD = os.getenv('DISCORD_GUILD')
 GAIANET_API_KEY = os.getenv("GAIANET_API_KEY")
 
-GAIANET_BASE_URL = os.getenv("GAIANET_BASE_URL")
-GAIANET_MODEL_NAME = os.getenv("GAIANET_MODEL_NAME")
-
-GAIANET_EMBEDDING_BASE_URL = os.getenv("GAIANET_EMBEDDING_BASE_URL", "https://qwen7b.gaia.domains/v1")
-GAIANET_EMBEDDING_MODEL = os.getenv("GAIANET_EMBEDDING_EMBEDDING_MODEL", "nomic-embed-text-v1.5.f16")
-
 SIMILARITY_THRESHOLD = 0.75
-
-gaia_client = OpenAI(
-    base_url=GAIANET_BASE_URL,
-    api_key=GAIANET_API_KEY
-)
-
-gaia_embedding_client = OpenAI(
-    base_url=GAIANET_EMBEDDING_BASE_URL,
-    api_key=GAIANET_API_KEY
-)
+GAIA_STREAM_RESPONSES = os.getenv("GAIA_STREAM_RESPONSES", "true").lower() == "true"
+GAIA_HISTORY_TOKEN_BUDGET = int(os.getenv("GAIA_HISTORY_TOKEN_BUDGET", "1500"))
+GAIA_HISTORY_SUMMARY = os.getenv("GAIA_HISTORY_SUMMARY", "true").lower() == "true"
+MEMORY_IMPORT_BATCH_SIZE = int(os.getenv("MEMORY_IMPORT_BATCH_SIZE", "128"))
+MEMORY_IMPORT_CONCURRENCY = int(os.getenv("MEMORY_IMPORT_CONCURRENCY", "4"))
+MEMORY_IMPORT_MAX_BYTES = 8 * 1024 * 1024
+MEMORY_PAGE_SIZE = 10
+MEMORY_PAGE_ANSWER_CHARS = 250
+MEMORY_PAGE_TIMEOUT = 180
+IMPORT_PROGRESS_INTERVAL = 2.0
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -45,11 +56,32 @@ intents.guild_messages = True
 bot = commands.Bot(command_prefix="!", intents=intents, case_insensitive=True)
 
 DB_NAME = 'bot_memory.db'
-MAX_HISTORY_MESSAGES = 20
+MAX_HISTORY_MESSAGES = 50
 
 ALLOWED_ROLES = ["Admin", "Moderator"]
 
-def init_db():
+SYSTEM_PROMPT = "You are a helpful AI assistant on Discord, powered by GaiaNet. Provide concise and direct answers."
+SUMMARY_PROMPT_TEMPLATE = (
+    "Update the running summary of this Discord conversation with the new messages below. "
+    "Keep every fact, name and open question that later answers may need, in at most 150 words. "
+    "Reply with the summary only.\n\n"
+    "Current summary:\n{summary}\n\n"
+    "New messages:\n{transcript}"
+)
+
+completion_flights = SingleFlight()
+history_claims = set()
+summaries_in_progress = set()
+chat_history_store = ChatHistoryStore(DB_NAME, max_messages=MAX_HISTORY_MESSAGES)
+
+def memory_guild_id(guild):
+    # Memories and histories are namespaced per guild; DMs share guild 0.
+    return guild.id if guild else 0
+
+def conversation_key(guild_id, channel_id):
+    return f"{guild_id or 0}:{channel_id}"
+
+def init_db(legacy_guild_id=0):
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
     cursor.execute('''
@@ -61,79 +93,148 @@ def init_db():
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS permanent_memory (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            keyword TEXT NOT NULL UNIQUE,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            keyword TEXT NOT NULL,
             answer TEXT NOT NULL,
-            embedding TEXT NOT NULL
+            embedding BLOB NOT NULL,
+            embedding_dim INTEGER NOT NULL,
+            embedding_model TEXT NOT NULL,
+            UNIQUE (guild_id, keyword)
         )
     ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS permanent_memory_aliases (
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            alias TEXT NOT NULL,
+            memory_id INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, alias)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_permanent_memory_aliases_memory ON permanent_memory_aliases (memory_id)')
+    chat_columns = [row[1] for row in cursor.execute('PRAGMA table_info(chat_histories)')]
+    if 'summary' not in chat_columns:
+        cursor.execute('ALTER TABLE chat_histories ADD COLUMN summary TEXT')
     conn.commit()
-    conn.close()
-
-def get_chat_history(conversation_id):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('SELECT history FROM chat_histories WHERE conversation_id = ?', (conversation_id,))
-    result = cursor.fetchone()
-    conn.close()
-    if result:
-        return json.loads(result[0])
-    return []
-
-def save_chat_history(conversation_id, history):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    history_json = json.dumps(history)
-    cursor.execute(
-        'INSERT OR REPLACE INTO chat_histories (conversation_id, history) VALUES (?, ?)',
-        (conversation_id, history_json)
-    )
+    migrate_permanent_memory_embeddings(conn)
+    migrate_to_guild_namespaces(conn, legacy_guild_id)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_permanent_memory_guild_id ON permanent_memory (guild_id, id)')
     conn.commit()
     conn.close()
 
-def clear_chat_history_db(conversation_id):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM chat_histories WHERE conversation_id = ?', (conversation_id,))
-    conn.commit()
-    conn.close()
+def migrate_permanent_memory_embeddings(conn):
+    # One-shot upgrade from JSON-text embeddings to packed float32 BLOBs.
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(permanent_memory)')]
+    if 'embedding_dim' in columns:
+        return
 
-async def get_embedding(text: str) -> list[float]:
-    try:
-        response = await asyncio.to_thread(
-            gaia_embedding_client.embeddings.create,
-            model=GAIANET_EMBEDDING_MODEL,
-            input=[text]
+    print("Migrating permanent_memory embeddings from JSON text to float32 BLOBs...")
+    conn.execute('BEGIN')
+    seq_row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'permanent_memory'").fetchone()
+    conn.execute('''
+        CREATE TABLE permanent_memory_migrated (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT NOT NULL UNIQUE,
+            answer TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            embedding_dim INTEGER NOT NULL,
+            embedding_model TEXT NOT NULL
         )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error getting embedding from GaiaNet API: {e}")
-        raise
-
-def calculate_cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
-    vec1_np = np.array(vec1)
-    vec2_np = np.array(vec2)
-
-    dot_product = np.dot(vec1_np, vec2_np)
-    norm_vec1 = np.linalg.norm(vec1_np)
-    norm_vec2 = np.linalg.norm(vec2_np)
-
-    if norm_vec1 == 0 or norm_vec2 == 0:
-        return 0.0
+    ''')
+    migrated = 0
+    for mem_id, keyword, answer, embedding_json in conn.execute('SELECT id, keyword, answer, embedding FROM permanent_memory'):
+        embedding = json.loads(embedding_json)
+        conn.execute(
+            'INSERT INTO permanent_memory_migrated (id, keyword, answer, embedding, embedding_dim, embedding_model) VALUES (?, ?, ?, ?, ?, ?)',
+            # JSON-era rows were embedded by the legacy setting, so the
+            # re-embedder moves them if GAIANET_EMBEDDING_MODEL now differs.
+            (mem_id, keyword, answer, pack_embedding(embedding), len(embedding), GAIANET_LEGACY_EMBEDDING_MODEL)
+        )
+        migrated += 1
+    conn.execute('DROP TABLE permanent_memory')
+    conn.execute('ALTER TABLE permanent_memory_migrated RENAME TO permanent_memory')
+    if seq_row:
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'permanent_memory'",
+            (seq_row[0],)
+        )
+    conn.commit()
+    print(f"Migrated {migrated} permanent memories.")
+
+def migrate_to_guild_namespaces(conn, legacy_guild_id):
+    # One-shot split of the global tables into per-guild namespaces. Existing
+    # memories and channel histories belong to the bot's home guild.
+    memory_columns = [row[1] for row in conn.execute('PRAGMA table_info(permanent_memory)')]
+    alias_columns = [row[1] for row in conn.execute('PRAGMA table_info(permanent_memory_aliases)')]
+    if 'guild_id' in memory_columns and 'guild_id' in alias_columns:
+        return
 
-    return dot_product / (norm_vec1 * norm_vec2)
+    print(f"Moving permanent memories and chat histories into guild {legacy_guild_id}...")
+    conn.execute('BEGIN')
+    if 'guild_id' not in memory_columns:
+        seq_row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'permanent_memory'").fetchone()
+        conn.execute('''
+            CREATE TABLE permanent_memory_partitioned (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL DEFAULT 0,
+                keyword TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                embedding_dim INTEGER NOT NULL,
+                embedding_model TEXT NOT NULL,
+                UNIQUE (guild_id, keyword)
+            )
+        ''')
+        conn.execute(
+            'INSERT INTO permanent_memory_partitioned (id, guild_id, keyword, answer, embedding, embedding_dim, embedding_model) '
+            'SELECT id, ?, keyword, answer, embedding, embedding_dim, embedding_model FROM permanent_memory',
+            (legacy_guild_id,)
+        )
+        conn.execute('DROP TABLE permanent_memory')
+        conn.execute('ALTER TABLE permanent_memory_partitioned RENAME TO permanent_memory')
+        if seq_row:
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'permanent_memory'",
+                (seq_row[0],)
+            )
+    if 'guild_id' not in alias_columns:
+        conn.execute('''
+            CREATE TABLE permanent_memory_aliases_partitioned (
+                guild_id INTEGER NOT NULL DEFAULT 0,
+                alias TEXT NOT NULL,
+                memory_id INTEGER NOT NULL,
+                PRIMARY KEY (guild_id, alias)
+            )
+        ''')
+        conn.execute(
+            'INSERT INTO permanent_memory_aliases_partitioned (guild_id, alias, memory_id) SELECT ?, alias, memory_id FROM permanent_memory_aliases',
+            (legacy_guild_id,)
+        )
+        conn.execute('DROP TABLE permanent_memory_aliases')
+        conn.execute('ALTER TABLE permanent_memory_aliases_partitioned RENAME TO permanent_memory_aliases')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_permanent_memory_aliases_memory ON permanent_memory_aliases (memory_id)')
+    conn.execute(
+        "UPDATE chat_histories SET conversation_id = ? || ':' || conversation_id WHERE instr(conversation_id, ':') = 0",
+        (str(legacy_guild_id),)
+    )
+    conn.commit()
 
-async def add_permanent_memory(keyword, answer):
+async def add_permanent_memory(keyword, answer, aliases=None, guild_id=0):
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
     try:
         embedding = await get_embedding(keyword)
-        embedding_json = json.dumps(embedding)
-
         cursor.execute(
-            'INSERT INTO permanent_memory (keyword, answer, embedding) VALUES (?, ?, ?)',
-            (keyword.lower(), answer, embedding_json)
+            'INSERT INTO permanent_memory (guild_id, keyword, answer, embedding, embedding_dim, embedding_model) VALUES (?, ?, ?, ?, ?, ?)',
+            (guild_id, keyword.lower(), answer, pack_embedding(embedding), len(embedding), GAIANET_EMBEDDING_MODEL)
+        )
+        memory_id = cursor.lastrowid
+        alias_keys = [key for key in (normalize_keyword(alias) for alias in aliases or []) if key]
+        cursor.executemany(
+            'INSERT OR IGNORE INTO permanent_memory_aliases (guild_id, alias, memory_id) VALUES (?, ?, ?)',
+            [(guild_id, alias, memory_id) for alias in alias_keys]
         )
         conn.commit()
+        guild_memories.apply(guild_id, lambda memory: memory.add(memory_id, keyword.lower(), answer, embedding, alias_keys))
         return True
     except sqlite3.IntegrityError:
         return False
@@ -143,33 +244,209 @@ async def add_permanent_memory(keyword, answer):
     finally:
         conn.close()
 
-def get_permanent_memories():
+def get_existing_memory_keywords(guild_id):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return {row[0] for row in conn.execute('SELECT keyword FROM permanent_memory WHERE guild_id = ?', (guild_id,))}
+    finally:
+        conn.close()
+
+def insert_permanent_memories(rows, guild_id):
+    # rows: (keyword, answer, embedding, alias_keys). One transaction for the whole import.
+    conn = sqlite3.connect(DB_NAME)
+    inserted = []
+    try:
+        with conn:
+            for keyword, answer, embedding, alias_keys in rows:
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO permanent_memory (guild_id, keyword, answer, embedding, embedding_dim, embedding_model) VALUES (?, ?, ?, ?, ?, ?)',
+                    (guild_id, keyword, answer, pack_embedding(embedding), len(embedding), GAIANET_EMBEDDING_MODEL)
+                )
+                if cursor.rowcount == 0:
+                    continue
+                memory_id = cursor.lastrowid
+                conn.executemany(
+                    'INSERT OR IGNORE INTO permanent_memory_aliases (guild_id, alias, memory_id) VALUES (?, ?, ?)',
+                    [(guild_id, alias, memory_id) for alias in alias_keys]
+                )
+                inserted.append((memory_id, keyword, answer, embedding, alias_keys))
+    finally:
+        conn.close()
+    return inserted
+
+async def import_permanent_memories(records, on_progress=None, guild_id=0):
+    """Embeds records in batches and inserts the new ones; returns (imported, duplicates).
+
+    on_progress(done, total) counts skipped duplicates as done, so total is
+    always len(records)."""
+    existing = await asyncio.to_thread(get_existing_memory_keywords, guild_id)
+    fresh = []
+    for record in records:
+        keyword = record.keyword.lower()
+        if keyword in existing:
+            continue
+        existing.add(keyword)
+        fresh.append((keyword, record.answer, [key for key in map(normalize_keyword, record.aliases) if key]))
+    duplicates = len(records) - len(fresh)
+
+    batches = [fresh[i:i + MEMORY_IMPORT_BATCH_SIZE] for i in range(0, len(fresh), MEMORY_IMPORT_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(MEMORY_IMPORT_CONCURRENCY)
+    embedded = 0
+
+    async def embed_batch(batch):
+        nonlocal embedded
+        async with semaphore:
+            vectors = await create_embeddings([keyword for keyword, _, _ in batch])
+        embedded += len(batch)
+        if on_progress:
+            await on_progress(duplicates + embedded, len(records))
+        return vectors
+
+    vectors = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    rows = [
+        (keyword, answer, embedding, alias_keys)
+        for batch, batch_vectors in zip(batches, vectors)
+        for (keyword, answer, alias_keys), embedding in zip(batch, batch_vectors)
+    ]
+    inserted = await asyncio.to_thread(insert_permanent_memories, rows, guild_id)
+    def add_inserted(memory):
+        for memory_id, keyword, answer, embedding, alias_keys in inserted:
+            memory.add(memory_id, keyword, answer, embedding, alias_keys)
+    guild_memories.apply(guild_id, add_inserted)
+    return len(inserted), duplicates + len(rows) - len(inserted)
+
+def export_permanent_memories(path, fmt, guild_id=0):
+    # Iterates the cursor row by row and never selects the embedding column.
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        rows = conn.execute(
+            "SELECT m.keyword, m.answer, (SELECT group_concat(a.alias, char(31)) FROM permanent_memory_aliases a WHERE a.memory_id = m.id) "
+            "FROM permanent_memory m WHERE m.guild_id = ? ORDER BY m.id",
+            (guild_id,)
+        )
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            return write_memory_export(rows, out, fmt)
+    finally:
+        conn.close()
+
+def get_permanent_memories(guild_id=0):
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
-    cursor.execute('SELECT id, keyword, answer, embedding FROM permanent_memory ORDER BY id')
+    cursor.execute('SELECT id, keyword, answer, embedding, embedding_model FROM permanent_memory WHERE guild_id = ? ORDER BY id', (guild_id,))
     results = cursor.fetchall()
     conn.close()
-    return [(r[0], r[1], r[2], json.loads(r[3])) for r in results]
+    return [(r[0], r[1], r[2], unpack_embedding(r[3]), r[4]) for r in results]
+
+def get_permanent_memory_page(guild_id=0, prefix=None, after=None, before=None, limit=MEMORY_PAGE_SIZE):
+    """One page of (id, keyword, answer) plus whether more rows exist past it.
+
+    Keyset pagination: plain listings page on id and prefix searches page on
+    keyword, so every page is a range scan on an index and never an OFFSET.
+    Pass `after` for the next page and `before` for the previous one.
+    """
+    key = "keyword" if prefix else "id"
+    where, params = ["guild_id = ?"], [guild_id]
+    if prefix:
+        prefix = prefix.lower()
+        where.append("keyword >= ? AND keyword < ?")
+        params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+    if after is not None:
+        where.append(f"{key} > ?")
+        params.append(after)
+    elif before is not None:
+        where.append(f"{key} < ?")
+        params.append(before)
+    order = "DESC" if before is not None else "ASC"
 
-def delete_permanent_memory(memory_id):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        rows = conn.execute(
+            f"SELECT id, keyword, answer FROM permanent_memory WHERE {' AND '.join(where)} ORDER BY {key} {order} LIMIT ?",
+            (*params, limit + 1)
+        ).fetchall()
+    finally:
+        conn.close()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if before is not None:
+        rows.reverse()
+    return rows, has_more
+
+def get_permanent_memory_aliases(guild_id=0):
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM permanent_memory WHERE id = ?', (memory_id,))
-    conn.commit()
+    cursor.execute('SELECT alias, memory_id FROM permanent_memory_aliases WHERE guild_id = ?', (guild_id,))
+    results = cursor.fetchall()
+    conn.close()
+    return results
+
+def delete_permanent_memory(memory_id, guild_id=0):
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM permanent_memory WHERE id = ? AND guild_id = ?', (memory_id, guild_id))
     rows_affected = cursor.rowcount
+    if rows_affected:
+        cursor.execute('DELETE FROM permanent_memory_aliases WHERE memory_id = ?', (memory_id,))
+    conn.commit()
     conn.close()
+    if rows_affected:
+        guild_memories.apply(guild_id, lambda memory: memory.remove(memory_id))
     return rows_affected > 0
 
-async def get_gaia_ai_response(prompt_text, conversation_id):
+def load_guild_memory_rows(guild_id):
+    return get_permanent_memories(guild_id), get_permanent_memory_aliases(guild_id)
+
+guild_memories = GuildMemoryRegistry(
+    load_guild_memory_rows,
+    lambda guild_id: create_memory_index(model=GAIANET_EMBEDDING_MODEL, path=guild_index_path(guild_id)),
+    GAIANET_EMBEDDING_MODEL
+)
+
+def on_memory_reembedded(memory_id, guild_id, keyword, answer, embedding, old_model):
+    guild_memories.apply(guild_id, lambda memory: memory.migrate(memory_id, keyword, answer, embedding, old_model))
+
+def ai_traffic_is_busy():
+    return ai_scheduler.queued > 0 or ai_scheduler.running >= max(ai_scheduler.workers // 2, 1)
+
+memory_reembedder = MemoryReembedder(DB_NAME, GAIANET_EMBEDDING_MODEL, on_memory_reembedded, ai_traffic_is_busy)
+
+def completion_flight_key(messages_for_api):
+    *context, question = messages_for_api
+    payload = json.dumps([context, normalize_keyword(question["content"])], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def run_chat_completion(messages_for_api, on_delta=None):
+    if on_delta:
+        parts = []
+        async for delta in stream_chat_completion(messages_for_api, temperature=0.7, max_tokens=500):
+            parts.append(delta)
+            on_delta(delta)
+        return "".join(parts)
+    response = await create_chat_completion(messages_for_api, temperature=0.7, max_tokens=500)
+    return response.choices[0].message.content
+
+async def get_gaia_ai_response(prompt_text, conversation_id, on_delta=None, guild_id=None):
+    user_embedding = None
     try:
+        # A failed guild load is treated like "no memory match" so the question still reaches the LLM.
+        guild_memory = await guild_memories.get(guild_id or 0)
+        exact_match = guild_memory.lookup_exact(prompt_text)
+        if exact_match:
+            print(f"Exact memory match found for '{prompt_text}' with keyword '{exact_match[1]}'")
+            return exact_match[2]
+
         user_embedding = await get_embedding(prompt_text)
-        permanent_memories = get_permanent_memories()
 
-        for mem_id, keyword, answer, stored_embedding in permanent_memories:
-            similarity = calculate_cosine_similarity(user_embedding, stored_embedding)
-            if similarity >= SIMILARITY_THRESHOLD:
-                print(f"Semantic match found for '{prompt_text}' with keyword '{keyword}' (Similarity: {similarity:.2f})")
-                return answer
+        best_match = await guild_memory.search(prompt_text, user_embedding, get_embedding)
+        if best_match and best_match[3] >= SIMILARITY_THRESHOLD:
+            mem_id, keyword, answer, similarity = best_match
+            print(f"Semantic match found for '{prompt_text}' with keyword '{keyword}' (Similarity: {similarity:.2f})")
+            return answer
+
+        if GAIA_ANSWER_CACHE_ENABLED:
+            cached_answer = answer_cache.lookup(guild_id, user_embedding)
+            if cached_answer:
+                return cached_answer
 
     except Exception as e:
         print(f"Error during permanent memory semantic search: {e}")
@@ -180,34 +457,102 @@ async def get_gaia_ai_response(prompt_text, conversation_id):
         return botresponses.ERROR_GENERIC
 
     try:
-        chat_history = get_chat_history(conversation_id)
-
-        system_message = {"role": "system", "content": "You are a helpful AI assistant on Discord, powered by GaiaNet. Provide concise and direct answers."}
+        history_epoch = chat_history_store.epoch(conversation_id)
+        chat_history, summary = await chat_history_store.get_with_summary(conversation_id)
 
+        system_message = {"role": "system", "content": SYSTEM_PROMPT}
         user_message = {"role": "user", "content": prompt_text}
-        chat_history.append(user_message)
-
-        messages_for_api = [system_message] + chat_history[-(MAX_HISTORY_MESSAGES - 1):]
-
-        response = gaia_client.chat.completions.create(
-            model=GAIANET_MODEL_NAME,
-            messages=messages_for_api,
-            temperature=0.7,
-            max_tokens=500
-        )
-
-        ai_response_content = response.choices[0].message.content
+        prompt_head = [system_message]
+        if summary:
+            prompt_head.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+
+        budget = GAIA_HISTORY_TOKEN_BUDGET - sum(message_tokens(m) for m in prompt_head) - message_tokens(user_message)
+        older_messages, history_window = select_history_window(chat_history, budget)
+
+        messages_for_api = [to_api_message(m) for m in prompt_head + history_window + [user_message]]
+
+        # Identical questions asked over identical context share one completion,
+        # and every streaming caller gets its deltas.
+        flight_key = completion_flight_key(messages_for_api)
+        # Only the first asker in a conversation records the shared Q/A pair.
+        history_claim = (flight_key, conversation_id)
+        owns_history = history_claim not in history_claims
+        history_claims.add(history_claim)
+        try:
+            ai_response_content = await completion_flights.run(
+                flight_key,
+                lambda publish=None: run_chat_completion(messages_for_api, publish),
+                on_delta
+            )
+        finally:
+            if owns_history:
+                history_claims.discard(history_claim)
 
         ai_message = {"role": "assistant", "content": ai_response_content}
-        chat_history.append(ai_message)
+        message_tokens(ai_message)
+        if owns_history:
+            await chat_history_store.append(conversation_id, user_message, ai_message)
 
-        save_chat_history(conversation_id, chat_history[-MAX_HISTORY_MESSAGES:])
+        if GAIA_HISTORY_SUMMARY and older_messages and conversation_id not in summaries_in_progress:
+            summaries_in_progress.add(conversation_id)
+            asyncio.create_task(fold_history_into_summary(conversation_id, older_messages, summary, history_epoch))
+
+        if GAIA_ANSWER_CACHE_ENABLED and user_embedding is not None and ai_response_content:
+            answer_cache.store(guild_id, prompt_text, user_embedding, ai_response_content)
 
         return ai_response_content
     except Exception as e:
         print(f"Error calling GaiaNet API: {e}")
         return botresponses.GAIANET_ERROR
 
+async def fold_history_into_summary(conversation_id, older_messages, summary, epoch=None):
+    try:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in older_messages)
+        prompt = SUMMARY_PROMPT_TEMPLATE.format(summary=summary or "(none)", transcript=transcript)
+        response = await create_chat_completion([{"role": "user", "content": prompt}], temperature=0.2, max_tokens=250)
+        new_summary = response.choices[0].message.content.strip()
+        if new_summary:
+            await chat_history_store.fold(conversation_id, older_messages, new_summary, epoch)
+    except Exception as e:
+        print(f"Error summarizing chat history for {conversation_id}: {e}")
+    finally:
+        summaries_in_progress.discard(conversation_id)
+
+async def reply_with_stream(send_first, channel, prompt_text, conversation_id, guild_id=None):
+    reply = StreamingReply(send_first, channel)
+    await reply.start()
+    ai_response = botresponses.GAIANET_ERROR
+    try:
+        ai_response = await get_gaia_ai_response(prompt_text, conversation_id, on_delta=reply.push, guild_id=guild_id)
+    finally:
+        # Always replace the placeholder and stop the flush loop, even on failure.
+        await reply.finish(ai_response)
+
+def is_priority_member(member):
+    return isinstance(member, discord.Member) and any(role.name in ALLOWED_ROLES for role in member.roles)
+
+async def answer_question(send_reply, channel, author, question, guild_id=None):
+    # Every AI question goes through the fair scheduler; admins get the priority lane.
+    conversation_id = conversation_key(guild_id, channel.id)
+    priority = is_priority_member(author)
+    try:
+        if GAIA_STREAM_RESPONSES:
+            await ai_scheduler.run(
+                author.id, channel.id,
+                lambda: reply_with_stream(send_reply, channel, question, conversation_id, guild_id),
+                priority
+            )
+            return
+
+        ai_response = await ai_scheduler.run(
+            author.id, channel.id,
+            lambda: get_gaia_ai_response(question, conversation_id, guild_id=guild_id),
+            priority
+        )
+        await send_reply(ai_response)
+    except SchedulerOverloaded as e:
+        await send_reply(botresponses.GAIANET_USER_BUSY if e.reason == "user" else botresponses.GAIANET_BUSY)
+
 @bot.event
 async def on_ready():
     guild = discord.utils.get(bot.guilds, name=GUILD)
@@ -216,7 +561,10 @@ async def on_ready():
         f'{bot.user} is connected to the following guild:\n'
         f'{guild.name}(id: {guild.id})')
 
-    init_db()
+    init_db(memory_guild_id(guild))
+    chat_history_store.start()
+    guild_memories.start()
+    memory_reembedder.start()
     print(f"Bot is Working as {bot.user}")
     print(botresponses.HELLO_MESSAGE)
 
@@ -225,7 +573,7 @@ async def on_message(message: discord.Message):
     if message.author == bot.user:
         return
 
-    conversation_id = str(message.channel.id)
+    guild_id = message.guild.id if message.guild else None
 
     bot_mentioned = bot.user.mentioned_in(message)
 
@@ -251,8 +599,7 @@ async def on_message(message: discord.Message):
                 await message.reply(botresponses.GAIANET_NO_QUESTION_MENTION_REPLY)
                 return
 
-            ai_response = await get_gaia_ai_response(question_content, conversation_id)
-            await message.reply(ai_response)
+            await answer_question(message.reply, message.channel, message.author, question_content, guild_id)
             return
     await bot.process_commands(message)
 
@@ -262,62 +609,270 @@ async def ask_gaia_command(ctx, *, question: str = None):
         await ctx.send(botresponses.GAIANET_NO_QUESTION_COMMAND)
         return
 
-    conversation_id = str(ctx.channel.id)
-    ai_response = await get_gaia_ai_response(question, conversation_id)
-    await ctx.send(f"{ai_response}")
+    guild_id = ctx.guild.id if ctx.guild else None
+    await answer_question(ctx.send, ctx.channel, ctx.author, question, guild_id)
 
 @bot.command(name='clearhistory', help='Clears the bot\'s conversation memory for this channel.')
 @commands.has_any_role(*ALLOWED_ROLES)
 async def clear_history(ctx):
-    conversation_id = str(ctx.channel.id)
-    clear_chat_history_db(conversation_id)
+    conversation_id = conversation_key(memory_guild_id(ctx.guild), ctx.channel.id)
+    await chat_history_store.clear(conversation_id)
     await ctx.send("My conversation memory for this channel has been cleared!")
 
-@bot.command(name='remember', help='Adds a fact to the bot\'s permanent memory. Usage: !remember <keyword> | <answer>')
+@bot.command(name='remember', help='Adds a fact to the bot\'s permanent memory. Usage: !remember <keyword> | <answer> [| alias1, alias2]')
 @commands.has_any_role(*ALLOWED_ROLES)
 async def remember_command(ctx, *, args: str):
-    parts = args.split('|', 1)
-    if len(parts) != 2:
-        await ctx.send("Invalid format. Use: `!remember <keyword> | <answer>`")
+    parts = args.split('|', 2)
+    if len(parts) < 2:
+        await ctx.send("Invalid format. Use: `!remember <keyword> | <answer> [| alias1, alias2]`")
         return
 
     keyword = parts[0].strip()
     answer = parts[1].strip()
+    aliases = [alias.strip() for alias in parts[2].split(',') if alias.strip()] if len(parts) == 3 else []
 
     if not keyword or not answer:
         await ctx.send("Keyword and answer cannot be empty.")
         return
 
-    if await add_permanent_memory(keyword, answer):
+    if await add_permanent_memory(keyword, answer, aliases, memory_guild_id(ctx.guild)):
         await ctx.send(botresponses.MEMORY_ADD_SUCCESS.format(keyword=keyword, answer=answer))
     else:
         await ctx.send(botresponses.MEMORY_ADD_DUPLICATE.format(keyword=keyword))
 
-@bot.command(name='listmemories', help='Lists all facts the bot remembers permanently.')
+class MemoryListView(discord.ui.View):
+    def __init__(self, author_id, guild_id, prefix):
+        super().__init__(timeout=MEMORY_PAGE_TIMEOUT)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.prefix = prefix
+        self.rows = []
+        self.page = 1
+        self.message = None
+
+    def sort_key(self, row):
+        return row[1] if self.prefix else row[0]
+
+    async def load(self, after=None, before=None):
+        rows, has_more = await asyncio.to_thread(
+            get_permanent_memory_page, self.guild_id, self.prefix, after, before
+        )
+        if not rows:
+            return False
+        self.rows = rows
+        if before is not None:
+            self.page -= 1
+            self.previous_page.disabled = not has_more
+            self.next_page.disabled = False
+        else:
+            if after is not None:
+                self.page += 1
+            self.previous_page.disabled = self.page == 1
+            self.next_page.disabled = not has_more
+        return True
+
+    def build_embed(self):
+        title = "🧠 Permanent memories" + (f" starting with `{self.prefix}`" if self.prefix else "")
+        lines = []
+        for mem_id, keyword, answer in self.rows:
+            if len(answer) > MEMORY_PAGE_ANSWER_CHARS:
+                answer = answer[:MEMORY_PAGE_ANSWER_CHARS - 1] + "…"
+            lines.append(f"**ID:** `{mem_id}` | **Keyword:** `{keyword}`\n{answer}")
+        embed = discord.Embed(title=title, description="\n\n".join(lines), color=discord.Color.green())
+        embed.set_footer(text=f"Page {self.page}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the person who ran this command can turn its pages.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.load(before=self.sort_key(self.rows[0]))
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.load(after=self.sort_key(self.rows[-1]))
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+@bot.command(name='listmemories', help='Lists the facts the bot remembers permanently. Usage: !listmemories [keyword prefix]')
 @commands.has_any_role(*ALLOWED_ROLES)
-async def list_memories_command(ctx):
-    memories = get_permanent_memories()
-    if not memories:
-        await ctx.send(botresponses.MEMORY_LIST_EMPTY)
+async def list_memories_command(ctx, *, prefix: str = None):
+    prefix = prefix.strip().lower() if prefix and prefix.strip() else None
+    view = MemoryListView(ctx.author.id, memory_guild_id(ctx.guild), prefix)
+    if not await view.load():
+        await ctx.send(botresponses.MEMORY_LIST_NO_MATCH.format(prefix=prefix) if prefix else botresponses.MEMORY_LIST_EMPTY)
         return
+    view.message = await ctx.send(embed=view.build_embed(), view=view)
 
-    memory_list = "Here are my permanent memories:\n"
-    for mem_id, keyword, answer, _ in memories:
-        memory_list += f"**ID:** `{mem_id}` | **Keyword:** `{keyword}` | **Answer:** {answer}\n"
+@bot.command(name='importmemories', help='Imports facts from an attached .jsonl or .csv file (keyword, answer, optional aliases).')
+@commands.has_any_role(*ALLOWED_ROLES)
+async def import_memories_command(ctx):
+    attachment = ctx.message.attachments[0] if ctx.message.attachments else None
+    if attachment is None or not attachment.filename.lower().endswith(('.jsonl', '.csv')):
+        await ctx.send(botresponses.MEMORY_IMPORT_NO_FILE)
+        return
+    if attachment.size > MEMORY_IMPORT_MAX_BYTES:
+        await ctx.send(botresponses.MEMORY_IMPORT_TOO_LARGE)
+        return
 
-    if len(memory_list) > 2000:
-        await ctx.send(botresponses.MEMORY_LIST_TOO_LONG)
-    else:
-        await ctx.send(memory_list)
+    try:
+        records, errors = parse_memory_file(await attachment.read(), attachment.filename)
+    except UnicodeDecodeError:
+        await ctx.send(botresponses.MEMORY_IMPORT_BAD_ENCODING)
+        return
+    if not records:
+        await ctx.send(botresponses.MEMORY_IMPORT_NOTHING.format(errors="\n".join(errors[:5])))
+        return
+
+    progress_message = await ctx.send(botresponses.MEMORY_IMPORT_PROGRESS.format(done=0, total=len(records)))
+    last_update = asyncio.get_running_loop().time()
+
+    async def on_progress(done, total):
+        nonlocal last_update
+        now = asyncio.get_running_loop().time()
+        if done < total and now - last_update < IMPORT_PROGRESS_INTERVAL:
+            return
+        last_update = now
+        try:
+            await progress_message.edit(content=botresponses.MEMORY_IMPORT_PROGRESS.format(done=done, total=total))
+        except discord.HTTPException:
+            pass
+
+    try:
+        imported, duplicates = await import_permanent_memories(records, on_progress, memory_guild_id(ctx.guild))
+    except Exception as e:
+        print(f"Error importing permanent memories: {e}")
+        await progress_message.edit(content=botresponses.EMBEDDING_ERROR)
+        return
+
+    summary = botresponses.MEMORY_IMPORT_DONE.format(imported=imported, duplicates=duplicates, invalid=len(errors))
+    if errors:
+        summary += "\n" + "\n".join(errors[:5])
+    await progress_message.edit(content=summary[:2000])
+
+@bot.command(name='exportmemories', help='Exports all permanent memories as a file. Usage: !exportmemories [jsonl|csv]')
+@commands.has_any_role(*ALLOWED_ROLES)
+async def export_memories_command(ctx, fmt: str = "jsonl"):
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        await ctx.send(botresponses.MEMORY_EXPORT_BAD_FORMAT)
+        return
+
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+    os.close(fd)
+    try:
+        count = await asyncio.to_thread(export_permanent_memories, path, fmt, memory_guild_id(ctx.guild))
+        if count == 0:
+            await ctx.send(botresponses.MEMORY_LIST_EMPTY)
+            return
+        await ctx.send(
+            botresponses.MEMORY_EXPORT_DONE.format(count=count),
+            file=discord.File(path, filename=f"permanent_memories.{fmt}")
+        )
+    finally:
+        os.remove(path)
 
 @bot.command(name='forgetmemory', help='Removes a fact from the bot\'s permanent memory by its ID. Usage: !forgetmemory <ID>')
 @commands.has_any_role(*ALLOWED_ROLES)
 async def forget_memory_command(ctx, memory_id: int):
-    if delete_permanent_memory(memory_id):
+    if delete_permanent_memory(memory_id, memory_guild_id(ctx.guild)):
         await ctx.send(botresponses.MEMORY_FORGET_SUCCESS.format(memory_id=memory_id))
     else:
         await ctx.send(botresponses.MEMORY_FORGET_NOT_FOUND.format(memory_id=memory_id))
 
+@bot.command(name='aistats', help='Shows cache statistics for the AI answer pipeline.')
+@commands.has_any_role(*ALLOWED_ROLES)
+async def ai_stats_command(ctx):
+    stats = embedding_cache.stats()
+    batch_stats = embedding_batcher.stats()
+    answer_stats = answer_cache.stats()
+    embedding_flight_stats = embedding_flights.stats()
+    completion_flight_stats = completion_flights.stats()
+    scheduler_stats = ai_scheduler.stats()
+    reembed_stats = memory_reembedder.stats()
+    memory_stats = guild_memories.stats()
+    wyr_history_stats = wyr_question_history.stats()
+    pack_stats = content_packs.stats()
+    wyr_cog = bot.get_cog("WYR")
+    wyr_bank_line = ""
+    if wyr_cog:
+        bank_stats = wyr_cog.question_bank.stats()
+        wyr_bank_line = (
+            f"WYR bank buffered: `{bank_stats['buffered']}` | Generated: `{bank_stats['generated']}` | "
+            f"Served: `{bank_stats['served']}` | Generated inline: `{bank_stats['misses']}`\n"
+        )
+    pipeline_stats = (
+        "**Request queue**\n"
+        f"Running: `{scheduler_stats['running']}` | Queued: `{scheduler_stats['queued']}` | Priority: `{scheduler_stats['priority_queued']}` | Busiest channel: `{scheduler_stats['busiest_channel_depth']}`\n"
+        f"Wait avg: `{scheduler_stats['avg_wait']:.2f}s` | p95: `{scheduler_stats['p95_wait']:.2f}s` | max: `{scheduler_stats['max_wait']:.2f}s` | "
+        f"Shed (user/channel/queue): `{scheduler_stats['shed']['user']}/{scheduler_stats['shed']['channel']}/{scheduler_stats['shed']['queue']}`\n"
+        "**Embedding cache**\n"
+        f"Memory hits: `{stats['memory_hits']}` | Disk hits: `{stats['disk_hits']}` | Misses: `{stats['misses']}`\n"
+        f"Hit rate: `{stats['hit_rate']:.1%}` | Resident entries: `{stats['memory_entries']}`\n"
+        "**Embedding batches**\n"
+        f"Requests: `{batch_stats['requests']}` | Batches sent: `{batch_stats['batches_sent']}` | Avg batch size: `{batch_stats['avg_batch_size']:.1f}`\n"
+        "**Re-embedding**\n"
+        f"Running: `{reembed_stats['running']}` | Migrated: `{reembed_stats['migrated']}` | Remaining: `{reembed_stats['remaining']}`\n"
+        "**Guild memory indexes**\n"
+        f"Loaded guilds: `{memory_stats['loaded_guilds']}` | Entries: `{memory_stats['loaded_entries']}` | Loads: `{memory_stats['loads']}` | Idle evictions: `{memory_stats['evictions']}`\n"
+        "**Answer cache**\n"
+        f"Enabled: `{answer_stats['enabled']}` | Entries: `{answer_stats['entries']}` | Hits: `{answer_stats['hits']}` | Hit rate: `{answer_stats['hit_rate']:.1%}`\n"
+        "**Coalesced requests**\n"
+        f"Embeddings: `{embedding_flight_stats['coalesced']}` | Completions: `{completion_flight_stats['coalesced']}` | In flight: `{embedding_flight_stats['in_flight'] + completion_flight_stats['in_flight']}`\n"
+    )
+    games_stats = (
+        "**Games**\n"
+        f"WYR history guilds: `{wyr_history_stats['resident_guilds']}` | Questions: `{wyr_history_stats['resident_questions']}` | Repeats rejected: `{wyr_history_stats['rejected']}`\n"
+        + wyr_bank_line
+        + f"Content packs (reloads: `{content_packs.reloads}`): "
+        + " | ".join(f"{name}: `{pack['items']}`" + (f" (`{pack['errors']}` invalid)" if pack['errors'] else "") for name, pack in pack_stats.items())
+        + "\n"
+    )
+    # One message per section, split further if a pool lists many endpoints,
+    # so no single send goes over Discord's 2000 character limit.
+    sections = [
+        pipeline_stats,
+        games_stats,
+        format_router_stats("Chat endpoints", chat_router.stats()),
+        format_router_stats("Embedding endpoints", embedding_router.stats()),
+    ]
+    for section in sections:
+        for chunk in split_message(section):
+            await ctx.send(chunk)
+
+def format_router_stats(title, stats):
+    lines = [f"**{title}** (hedges sent: `{stats['hedges_sent']}`, won: `{stats['hedges_won']}`)"]
+    for endpoint in stats['endpoints']:
+        latency = f"{endpoint['ewma_latency'] * 1000:.0f}ms" if endpoint['ewma_latency'] is not None else "n/a"
+        state = "🔴 open" if endpoint['circuit_open'] else "🟢 closed"
+        lines.append(
+            f"`{endpoint['base_url']}` | EWMA: `{latency}` | Errors: `{endpoint['error_rate']:.0%}` | "
+            f"Requests: `{endpoint['requests']}` | Circuit: {state}"
+        )
+    return "\n".join(lines) + "\n"
+
+@bot.command(name='flushanswercache', help='Clears cached AI answers. Usage: !flushanswercache [all]')
+@commands.has_any_role(*ALLOWED_ROLES)
+async def flush_answer_cache_command(ctx, scope: str = None):
+    if scope == "all" or ctx.guild is None:
+        flushed = answer_cache.flush()
+    else:
+        flushed = answer_cache.flush(ctx.guild.id)
+    await ctx.send(botresponses.ANSWER_CACHE_FLUSHED.format(count=flushed))
+
 @bot.command(name='hello', help='Says hello to the user.')
 async def hello_command(ctx):
     await ctx.send(botresponses.HELLO_MESSAGE)
@@ -353,6 +908,7 @@ async def load_cogs():
     await bot.load_extension("cogs.Utility.send")
     await bot.load_extension("cogs.Utility.poll")
     await bot.load_extension("Utilities.Points_Leaderboard")
+    await bot.load_extension("Utilities.game_router")
 
     await bot.load_extension("cogs.basic")
     await bot.load_extension("cogs.games.GUESS_THE_NUMBER")
@@ -378,7 +934,16 @@ async def load_cogs():
 
 async def main():
     await load_cogs()
-    await bot.start(TOKEN)
+    try:
+        await bot.start(TOKEN)
+    finally:
+        memory_reembedder.stop()
+        guild_memories.close()
+        await chat_history_store.close()
+        await close_gaia_client()
+        embedding_cache.close()
+        wyr_question_history.close()
+        question_decks.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -9,6 +9,8 @@ NO_PERMISSION = "Sorry, you don't have the required permissions to use this comm
 GAIANET_ERROR = "I'm having trouble connecting to the GaiaNet AI right now. Please check the API status or try again later. 🚧"
 GAIANET_NO_QUESTION_COMMAND = "Please provide a question for the GaiaNet AI. Example: `!askgaia What is blockchain?`"
 GAIANET_NO_QUESTION_MENTION_REPLY = "Hey! Please ask me a question after mentioning me or in your reply. For example: `@YourBot What is the capital of France?`"
+GAIANET_BUSY = "I'm answering a lot of questions right now! Please try again in a moment. ⏳"
+GAIANET_USER_BUSY = "I'm still working on your earlier questions — give me a moment to answer those first! ⏳"
 
 
 
@@ -22,6 +24,14 @@ MEMORY_ADD_DUPLICATE = "I already have a memory for '{keyword}'. Please use a di
 MEMORY_FORGET_SUCCESS = "Memory with ID `{memory_id}` has been forgotten."
 MEMORY_FORGET_NOT_FOUND = "No memory found with ID `{memory_id}`."
 MEMORY_LIST_EMPTY = "I don't have any permanent memories yet."
-MEMORY_LIST_TOO_LONG = "My memories are too extensive to list here. Please check the console or database directly."
+MEMORY_LIST_NO_MATCH = "I don't have any permanent memories starting with `{prefix}`."
 EMBEDDING_ERROR = "I'm having trouble processing memories right now. The AI embedding service might be unavailable. 🧠❌"
-
+MEMORY_IMPORT_NO_FILE = "Please attach a `.jsonl` or `.csv` file to `!importmemories`."
+MEMORY_IMPORT_TOO_LARGE = "That file is too large to import. Please split it into files under 8 MB."
+MEMORY_IMPORT_BAD_ENCODING = "I couldn't read that file. Please save it as UTF-8."
+MEMORY_IMPORT_NOTHING = "I didn't find any valid memories in that file.\n{errors}"
+MEMORY_IMPORT_PROGRESS = "📥 Importing memories... `{done}`/`{total}` processed."
+MEMORY_IMPORT_DONE = "✅ Imported `{imported}` memories. Skipped `{duplicates}` duplicate(s) and `{invalid}` invalid line(s)."
+MEMORY_EXPORT_BAD_FORMAT = "Unknown format. Use `!exportmemories jsonl` or `!exportmemories csv`."
+MEMORY_EXPORT_DONE = "📤 Exported `{count}` memories."
+ANSWER_CACHE_FLUSHED = "Cleared `{count}` cached AI answer(s). 🧹"
@@ -1,10 +1,12 @@
 import discord
 import asyncio
-import json
-import random
 import os
 from discord.ext import commands
 from discord import app_commands
+from Utilities.game_router import game_message_router
+from Utilities.answer_matcher import AnswerMatcher
+from Utilities.question_deck import question_decks
+from Utilities.content_packs import content_packs
 
 
 from dotenv import load_dotenv
@@ -13,16 +15,13 @@ LEADERBOARD_CHANNEL_ID = int(os.getenv('LEADERBOARD_CHANNEL_ID'))
 PRIVATE_CHANNEL_ID = int(os.getenv('PRIVATE_CHANNEL_ID'))
 
 ALLOWED_ROLES = ["Game Master", "Moderator"]
-CATEGORY_FILES = {
-    "india": "Data/lyrics_India.json",
-    "pakistan": "Data/lyrics_Pakistan.json",
-    "nigeria": "Data/lyrics_Nigeria.json",
-    "global": "Data/lyrics_global.json"
+CATEGORY_PACKS = {
+    "india": "lyrics_india",
+    "pakistan": "lyrics_pakistan",
+    "nigeria": "lyrics_nigeria",
+    "global": "lyrics_global"
 }
 
-def normalize(text):
-    return ''.join(filter(str.isalnum, text.lower()))
-
 class Lyrics(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -57,49 +56,31 @@ class Lyrics(commands.Cog):
         self.active_lyrics[interaction.channel.id] = {"running": True, "stop_event": asyncio.Event()}
 
         await interaction.response.send_message(f"🎵 Starting Lyrics game in category: **{category.name}**")
-        self.bot.loop.create_task(self.run_lyrics_game(interaction.channel, interaction.user, CATEGORY_FILES[category.value]))
-
-    async def run_lyrics_game(self, channel, host, file_path):
-        lyrics_data = []
-        try:
-            with open(file_path, "r") as f:
-                lyrics_data = json.load(f)
-        except FileNotFoundError:
-            await channel.send(f"⚠️ Error: Lyrics file not found at `{file_path}`. Please ensure it exists.")
-            self.active_lyrics.pop(channel.id, None)
-            return
-        except json.JSONDecodeError:
-            await channel.send(f"⚠️ Error: Lyrics file at `{file_path}` is corrupted or empty. Please check its format.")
-            self.active_lyrics.pop(channel.id, None)
-            return
-        except Exception as e:
-            await channel.send(f"⚠️ Failed to load lyrics due to an unexpected error: `{e}`. Please try again later.")
-            self.active_lyrics.pop(channel.id, None)
-            return
-        
-        if not lyrics_data:
+        self.bot.loop.create_task(self.run_lyrics_game(interaction.channel, interaction.user, CATEGORY_PACKS[category.value]))
+
+    async def run_lyrics_game(self, channel, host, pack_name):
+        if not await content_packs.get(pack_name):
             await channel.send("❌ No lyrics found in the selected category file. Please add some lyrics to play.")
             self.active_lyrics.pop(channel.id, None)
             return
 
-        used_lines = set()
+        deck_key = f"lyrics:{channel.id}:{pack_name}"
         game_state = self.active_lyrics.get(channel.id)
 
         while game_state and game_state["running"] and not game_state["stop_event"].is_set():
             if self.leaderboard_cog and self.leaderboard_cog.is_leaderboard_full():
                 break
 
-            if len(used_lines) >= len(lyrics_data):
+            lyrics_data = await content_packs.get(pack_name)
+            if not lyrics_data:
+                break
+            index, reshuffled = await question_decks.draw(deck_key, len(lyrics_data))
+            if reshuffled:
                 await channel.send("🎉 All lyric lines in this category have been used! Resetting for new rounds.")
-                used_lines.clear()
-
-            line_obj = random.choice(lyrics_data)
-            while line_obj["line"] in used_lines and len(used_lines) < len(lyrics_data):
-                line_obj = random.choice(lyrics_data)
-            used_lines.add(line_obj["line"])
+            line_obj = lyrics_data[index]
 
-            answer = line_obj["answer"].lower()
-            lyric_line = line_obj["line"]
+            answer = line_obj.answer.lower()
+            lyric_line = line_obj.line
 
             embed = discord.Embed(
                 title="🎶 Guess the Song!",
@@ -108,11 +89,10 @@ class Lyrics(commands.Cog):
             )
             await channel.send(embed=embed)
 
-            def check(m):
-                return m.channel == channel and not m.author.bot and normalize(m.content) == normalize(answer)
+            matcher = AnswerMatcher(line_obj.answer, line_obj.aliases)
 
             try:
-                msg = await self.bot.wait_for("message", timeout=30.0, check=check)
+                msg, _ = await game_message_router.wait_for_answer(channel.id, matcher, 30.0)
 
                 user_id = str(msg.author.id)
 
@@ -4,6 +4,7 @@ import json
 import os
 from discord.ext import commands
 from discord import app_commands
+from Utilities.game_router import game_message_router
 
 
 from dotenv import load_dotenv
@@ -20,6 +21,13 @@ CHOICES = [
     app_commands.Choice(name="✂️ Scissors", value="scissors")
 ]
 
+GUESSES = {
+    "rock": "rock",
+    "paper": "paper",
+    "scissors": "scissors",
+    "scissor": "scissors"
+}
+
 BEATS = {
     "rock": "paper",
     "paper": "scissors",
@@ -92,15 +100,7 @@ class RPS(commands.Cog):
 
         while not stop_event.is_set():
             try:
-                msg = await self.bot.wait_for(
-                    "message",
-                    timeout=timeout_seconds,
-                    check=lambda m: m.channel == channel and not m.author.bot and m.content.lower().strip() in ["rock", "paper", "scissors", "scissor"]
-                )
-                
-                guess = msg.content.lower().strip()
-                if guess == "scissor":
-                    guess = "scissors"
+                msg, guess = await game_message_router.wait_for_answer(channel.id, GUESSES.get, timeout_seconds)
 
                 if guess == correct_guess:
                     winner_found = True
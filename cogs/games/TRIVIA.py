@@ -1,10 +1,12 @@
 import discord
-import random
-import json
 import asyncio
 import os
 from discord.ext import commands
 from discord import app_commands
+from Utilities.game_router import game_message_router
+from Utilities.answer_matcher import AnswerMatcher
+from Utilities.question_deck import question_decks
+from Utilities.content_packs import content_packs
 
 
 from dotenv import load_dotenv
@@ -20,9 +22,7 @@ class Trivia(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_trivia = {}
-        self.trivia_questions = self.load_questions()
         self.user_wins = {}
-        self.used_questions = set()
         self.leaderboard_cog = None
 
     @commands.Cog.listener()
@@ -35,31 +35,12 @@ class Trivia(commands.Cog):
         else:
             print("WARNING: Leaderboard cog not found. Leaderboard functions will not work.")
 
-    def load_questions(self):
-        try:
-            with open("Data/trivia_questions.json", "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("Error: Data/trivia_questions.json not found!")
-            return []
-        except json.JSONDecodeError:
-            print("Error: Data/trivia_questions.json is corrupted or empty.")
-            return []
-
-    def get_random_question(self):
-        if len(self.used_questions) >= len(self.trivia_questions) or not self.trivia_questions:
-            self.used_questions.clear()
-            if not self.trivia_questions:
-                return None
-
-        available = [q for q in self.trivia_questions if q["question"] not in self.used_questions]
-        if not available:
-            self.used_questions.clear()
-            available = self.trivia_questions[:]
-        
-        question = random.choice(available)
-        self.used_questions.add(question["question"])
-        return question
+    async def get_random_question(self, channel_id):
+        questions = await content_packs.get("trivia")
+        if not questions:
+            return None
+        index, _ = await question_decks.draw(f"trivia:{channel_id}", len(questions))
+        return questions[index]
 
     @app_commands.command(name="trivia", description="Start a trivia game")
     async def trivia(self, interaction: discord.Interaction):
@@ -69,7 +50,7 @@ class Trivia(commands.Cog):
         if interaction.channel.id in self.active_trivia:
             return await interaction.response.send_message("❗ Trivia is already running in this channel.", ephemeral=True)
         
-        if not self.trivia_questions:
+        if not await content_packs.get("trivia"):
             return await interaction.response.send_message("❌ No trivia questions loaded. Please check `Data/trivia_questions.json`.", ephemeral=True)
 
 
@@ -83,17 +64,18 @@ class Trivia(commands.Cog):
         if not self.active_trivia.get(channel.id, {}).get("running", False):
             return
 
-        question_data = self.get_random_question()
+        question_data = await self.get_random_question(channel.id)
         if not question_data:
             await channel.send("❌ No more unique trivia questions available!")
             del self.active_trivia[channel.id]
             return
 
-        correct_answer = question_data["answer"].strip().lower()
+        correct_answer = question_data.answer.lower()
+        matcher = AnswerMatcher(question_data.answer, question_data.aliases)
 
         embed = discord.Embed(
             title="🧠 Trivia Time!",
-            description=f"**{question_data['question']}**\n\n⏱️ You have 30 seconds to answer!",
+            description=f"**{question_data.question}**\n\n⏱️ You have 30 seconds to answer!",
             color=discord.Color.blurple()
         )
         await channel.send(embed=embed)
@@ -109,11 +91,7 @@ class Trivia(commands.Cog):
                 break
 
             try:
-                msg = await self.bot.wait_for(
-                    "message",
-                    timeout=remaining_time,
-                    check=lambda m: m.channel == channel and not m.author.bot and m.content.strip().lower() == correct_answer
-                )
+                msg, _ = await game_message_router.wait_for_answer(channel.id, matcher, remaining_time)
 
                 user_id = str(msg.author.id)
                 current_wins = self.user_wins.get(user_id, 0)
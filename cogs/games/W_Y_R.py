@@ -7,7 +7,9 @@ import Utilities
 import os
 import json
 
-from Utilities.wyr_utils import get_gaia_ai_response, get_embedding, calculate_cosine_similarity 
+from Utilities.wyr_utils import get_gaia_ai_response
+from Utilities.wyr_question_bank import WyrQuestionBank
+from Utilities.wyr_history import wyr_question_history
 from Data.wyr_questions import WYR_QUESTIONS
 
 WINNING_PROMPT_TEMPLATE = (
@@ -56,6 +58,7 @@ class WyrGame:
         self.is_active = True
         self.message_url: str = None
         self.available_local_questions = list(WYR_QUESTIONS)
+        self.game_id: int = None
 
 class WYR(commands.Cog):
     def __init__(self, bot):
@@ -63,6 +66,10 @@ class WYR(commands.Cog):
         self.active_games = {}
         self.user_session_correct_votes = {} 
         self.leaderboard_cog = None
+        self.question_bank = WyrQuestionBank(max_retries=MAX_QUESTION_RETRIES, similarity_threshold=QUESTION_SIMILARITY_THRESHOLD)
+
+    def cog_unload(self):
+        self.question_bank.stop()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -89,6 +96,12 @@ class WYR(commands.Cog):
         self.bot.loop.create_task(self.run_wyr_game(interaction.channel, new_game))
 
     async def run_wyr_game(self, channel: discord.TextChannel, game: WyrGame):
+        try:
+            game.game_id = await wyr_question_history.start_game(channel.guild.id)
+            game.available_local_questions = await wyr_question_history.filter_recent(channel.guild.id, game.available_local_questions)
+        except Exception as e:
+            print(f"Error loading WYR question history: {e}. Repeats from earlier games won't be filtered.")
+
         for i in range(game.total_rounds):
             if not game.is_active:
                 break
@@ -108,6 +121,10 @@ class WYR(commands.Cog):
             game.message = sent_message
             game.message_url = sent_message.jump_url
 
+            # Pre-generate AI questions while people vote, before the local ones run out.
+            if len(game.available_local_questions) <= self.question_bank.size:
+                self.question_bank.refill()
+
             await asyncio.sleep(VOTING_TIME_SECONDS)
 
             if game.is_active:
@@ -132,56 +149,33 @@ class WYR(commands.Cog):
                 game.available_local_questions.remove(raw_question)
                 print(f"Using local question: {raw_question}")
             
+            embedding = None
             if not raw_question:
+                options = None
                 for _ in range(MAX_QUESTION_RETRIES):
-                    prompt_for_question = (
-                        "Generate a **highly unique, diverse, and imaginative** 'Would You Rather' question. "
-                        "Ensure the two options are **distinct, silly, and creative**, and not commonly seen. "
-                        "Separate the options clearly with ' OR '. "
-                        "Do not include any extra sentences, introductory phrases, or explanations. "
-                        "Example: 'Have a tiny personal raincloud that only waters your plants OR be able to instantly learn any dance move perfectly?'"
-                    )
-                    raw_question = await get_gaia_ai_response(prompt_for_question)
-
-                    if not raw_question or ' OR ' not in raw_question:
-                        continue 
-
-                    parts = raw_question.split(' OR ', 1)
-                    if len(parts) < 2:
-                        continue 
-
-                    option_A = parts[0].strip()
-                    option_B = parts[1].strip()
-
-                    if option_A.startswith("Would you rather..."):
-                        option_A = option_A[len("Would you rather..."):].strip()
-                    if option_A.endswith("?") and not option_B.endswith("?"):
-                        option_A = option_A[:-1].strip()
-                    if option_B.endswith("?"):
-                        option_B = option_B[:-1].strip()
-
-                    try:
-                        embedding_A = await get_embedding(option_A)
-                        embedding_B = await get_embedding(option_B)
-                        similarity = calculate_cosine_similarity(embedding_A, embedding_B)
-
-                        if similarity < QUESTION_SIMILARITY_THRESHOLD:
-                            game.options = [option_A, option_B]
-                            break 
-                        else:
-                            print(f"Generated options too similar (Similarity: {similarity:.2f}). Retrying...")
-                    except Exception as e:
-                        print(f"Error checking similarity: {e}. Retrying question generation.")
-                        continue 
-                else: 
+                    options = await self.question_bank.take()
+                    if not options or game.game_id is None:
+                        break
+                    is_repeat, embedding = await wyr_question_history.check(channel.guild.id, *options)
+                    if not is_repeat:
+                        break
+                    options = None
+                if not options:
                     await channel.send("I couldn't come up with a sufficiently distinct 'Would You Rather' question after several attempts. Ending game early.")
                     return None
+                option_A, option_B = options
+                game.options = [option_A, option_B]
             else: 
                 parts = raw_question.split(' OR ', 1)
                 option_A = parts[0].strip()
                 option_B = parts[1].strip()
                 game.options = [option_A, option_B]
 
+            if game.game_id is not None:
+                self.bot.loop.create_task(
+                    wyr_question_history.record(channel.guild.id, game.game_id, option_A, option_B, embedding)
+                )
+
 
             view = discord.ui.View(timeout=VOTING_TIME_SECONDS)
             button_A = discord.ui.Button(label=option_A[:75], style=discord.ButtonStyle.blurple, custom_id=f"wyr_vote_A_{channel.id}_{game.current_round}")
@@ -274,14 +268,30 @@ class WYR(commands.Cog):
             result_embed.add_field(name="The Question:", value=f"**`{game.options[0]}`** OR **`{game.options[1]}`**", inline=False)
             await game.message.edit(embed=result_embed, view=None)
             if self.leaderboard_cog:
-                for user_id, _ in game.votes['A'] + game.votes['B']:
-                    await self.leaderboard_cog.add_points(user_id, MIN_POINTS_FOR_CORRECT // 2)
+                await self.leaderboard_cog.add_points_bulk(
+                    {user_id: MIN_POINTS_FOR_CORRECT // 2 for user_id, _ in game.votes['A'] + game.votes['B']}
+                )
             return
 
         winning_prompt = WINNING_PROMPT_TEMPLATE.format(winner_option_text=winner_option_text)
         losing_prompt = LOSING_PROMPT_TEMPLATE.format(loser_option_text=loser_option_text)
 
-        winning_statement = await get_gaia_ai_response(winning_prompt)
+        # Both explanations and the points update run while players read the
+        # first result, so the follow-up edit is ready when the timer ends.
+        winning_task = asyncio.create_task(get_gaia_ai_response(winning_prompt))
+        losing_task = asyncio.create_task(get_gaia_ai_response(losing_prompt))
+
+        winning_voters_info.sort(key=lambda x: x[1])
+        awards = {}
+        for i, (user_id, vote_time) in enumerate(winning_voters_info):
+            awards[user_id] = max(MIN_POINTS_FOR_CORRECT, MAX_POINTS_FOR_FIRST - (i * POINT_DECREMENT_PER_VOTER))
+        points_task = asyncio.create_task(self.leaderboard_cog.add_points_bulk(awards)) if self.leaderboard_cog else None
+
+        try:
+            winning_statement = await winning_task
+        except Exception:
+            losing_task.cancel()
+            raise
         
         result_embed = discord.Embed(
             title=f"✨ **Round {game.current_round} Results!** ✨",
@@ -301,16 +311,11 @@ class WYR(commands.Cog):
 
         await asyncio.sleep(EXPLANATION_READ_TIME_SECONDS)
 
-        winning_voters_info.sort(key=lambda x: x[1])
+        totals = await points_task if points_task else {}
         awarded_players_info = []
 
-        for i, (user_id, vote_time) in enumerate(winning_voters_info):
-            points_to_award = max(MIN_POINTS_FOR_CORRECT, MAX_POINTS_FOR_FIRST - (i * POINT_DECREMENT_PER_VOTER))
-            if self.leaderboard_cog:
-                await self.leaderboard_cog.add_points(user_id, points_to_award)
-                total_points = await self.leaderboard_cog.get_points(user_id)
-            else:
-                total_points = "N/A"
+        for user_id, points_to_award in awards.items():
+            total_points = totals.get(user_id, "N/A")
 
             self.user_session_correct_votes[channel.id][user_id] = \
                 self.user_session_correct_votes[channel.id].get(user_id, 0) + 1
@@ -329,7 +334,7 @@ class WYR(commands.Cog):
                     ))
 
 
-        losing_statement = await get_gaia_ai_response(losing_prompt)
+        losing_statement = await losing_task
 
         result_embed.description += (
             f"\n\n**`{loser_option_text}`** was the less popular choice "
@@ -1,10 +1,12 @@
 import discord
 import asyncio
-import random
-import json
 import os
 from discord.ext import commands
 from discord import app_commands
+from Utilities.game_router import game_message_router
+from Utilities.answer_matcher import AnswerMatcher
+from Utilities.question_deck import question_decks
+from Utilities.content_packs import content_packs
 
 
 from dotenv import load_dotenv
@@ -30,20 +32,6 @@ class EmojiDecode(commands.Cog):
         else:
             print("WARNING: Leaderboard cog not found. Leaderboard functions will not work for Emoji Decode.")
 
-    def load_clues(self):
-        try:
-            with open("Data/emoji_clues.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("Error: emoji_clues.json not found.")
-            return []
-        except json.JSONDecodeError:
-            print("Error: emoji_clues.json is corrupted or empty.")
-            return []
-        except Exception as e:
-            print(f"An unexpected error occurred while loading emoji_clues.json: {e}")
-            return []
-
     @app_commands.command(name="emoji", description="Guess the word based on emoji clues!")
     async def emoji(self, interaction: discord.Interaction):
         if not any(role.name in ALLOWED_ROLES for role in interaction.user.roles):
@@ -54,8 +42,7 @@ class EmojiDecode(commands.Cog):
             await interaction.response.send_message("❗ An emoji game is already running in this channel.", ephemeral=True)
             return
 
-        clues = self.load_clues()
-        if not clues:
+        if not await content_packs.get("emoji"):
             await interaction.response.send_message("❌ No emoji clues found or loaded. Please check the `emoji_clues.json` file.", ephemeral=True)
             return
 
@@ -63,7 +50,6 @@ class EmojiDecode(commands.Cog):
             "running": True,
             "stop_event": asyncio.Event(),
             "host": interaction.user,
-            "clues": clues,
             "hint_task": None
         }
         await interaction.response.send_message("🔤 Starting Emoji Decode game!")
@@ -76,23 +62,20 @@ class EmojiDecode(commands.Cog):
             return
 
         host = game_state["host"]
-        clues = game_state["clues"]
-        used_clues = set()
 
         while game_state["running"] and not game_state["stop_event"].is_set():
             if self.leaderboard_cog and self.leaderboard_cog.is_leaderboard_full():
                 break
 
-            if len(used_clues) >= len(clues):
+            clues = await content_packs.get("emoji")
+            if not clues:
+                break
+            index, reshuffled = await question_decks.draw(f"emoji:{channel.id}", len(clues))
+            if reshuffled:
                 await channel.send("🎉 All emoji clues have been used! Resetting for new rounds.")
-                used_clues.clear()
+            clue = clues[index]
 
-            clue = random.choice(clues)
-            while clue["emoji"] in used_clues and len(used_clues) < len(clues):
-                clue = random.choice(clues)
-            used_clues.add(clue["emoji"])
-
-            emoji_clue, answer = clue["emoji"], clue["answer"].strip().lower()
+            emoji_clue, answer = clue.emoji, clue.answer.lower()
 
             embed = discord.Embed(
                 title="🧩 Emoji Decode!",
@@ -103,15 +86,10 @@ class EmojiDecode(commands.Cog):
 
             game_state["hint_task"] = self.bot.loop.create_task(self.send_hints(channel, answer))
 
-            def check(m):
-                return (
-                    m.channel == channel and
-                    not m.author.bot and
-                    m.content.strip().lower() == answer
-                )
+            matcher = AnswerMatcher(clue.answer, clue.aliases)
 
             try:
-                msg = await self.bot.wait_for("message", timeout=60.0, check=check)
+                msg, _ = await game_message_router.wait_for_answer(channel.id, matcher, 60.0)
 
                 if game_state["stop_event"].is_set():
                     break
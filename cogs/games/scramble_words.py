@@ -1,10 +1,13 @@
 import discord
 import random
-import json
 import asyncio
 import os
 from discord.ext import commands
 from discord import app_commands
+from Utilities.game_router import game_message_router
+from Utilities.answer_matcher import AnswerMatcher
+from Utilities.question_deck import question_decks
+from Utilities.content_packs import content_packs
 
 
 from dotenv import load_dotenv
@@ -19,9 +22,7 @@ class Scramble(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_scramble = {}
-        self.scramble_words = self.load_words()
         self.user_wins = {}
-        self.used_words = set()
         self.leaderboard_cog = None
 
     @commands.Cog.listener()
@@ -35,29 +36,13 @@ class Scramble(commands.Cog):
             print("WARNING: Leaderboard cog not found. Leaderboard functions will not work for Scramble.")
 
 
-    def load_words(self):
-        try:
-            with open("Data/scramble_words.json", "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("Error: Data/scramble_words.json not found!")
-            return []
-        except json.JSONDecodeError:
-            print("Error: Data/scramble_words.json is corrupted or empty.")
-            return []
-
-    def get_random_word(self):
-        if len(self.used_words) >= len(self.scramble_words) or not self.scramble_words:
-            self.used_words.clear()
-            if not self.scramble_words:
-                return None, None
-
-        available = [w for w in self.scramble_words if w not in self.used_words]
-        if not available:
-            self.used_words.clear()
-            available = self.scramble_words[:]
-
-        word = random.choice(available)
+    async def get_random_word(self, channel_id):
+        words = await content_packs.get("scramble")
+        if not words:
+            return None, None
+
+        index, _ = await question_decks.draw(f"scramble:{channel_id}", len(words))
+        word = words[index]
         scrambled = ''.join(random.sample(word, len(word)))
         while scrambled == word:
             scrambled = ''.join(random.sample(word, len(word)))
@@ -71,7 +56,7 @@ class Scramble(commands.Cog):
         if interaction.channel.id in self.active_scramble:
             return await interaction.response.send_message("❗ Scramble is already running in this channel.", ephemeral=True)
         
-        if not self.scramble_words:
+        if not await content_packs.get("scramble"):
             return await interaction.response.send_message("❌ No scramble words loaded. Please check `Data/scramble_words.json`.", ephemeral=True)
 
 
@@ -84,7 +69,7 @@ class Scramble(commands.Cog):
         if not self.active_scramble.get(channel.id, {}).get("running", False):
             return
 
-        word, scrambled = self.get_random_word()
+        word, scrambled = await self.get_random_word(channel.id)
         if not word:
             await channel.send("❌ No more unique scramble words available!")
             del self.active_scramble[channel.id]
@@ -97,6 +82,8 @@ class Scramble(commands.Cog):
         )
         await channel.send(embed=embed)
 
+        # Exact only: a one-letter slip can spell a different word from the same letters.
+        matcher = AnswerMatcher(word, max_typos=0)
         stop_event = self.active_scramble[channel.id]["stop_event"]
         start_time = asyncio.get_event_loop().time()
 
@@ -108,11 +95,7 @@ class Scramble(commands.Cog):
                 break
 
             try:
-                msg = await self.bot.wait_for(
-                    "message",
-                    timeout=remaining_time,
-                    check=lambda m: m.channel == channel and not m.author.bot and m.content.strip().lower() == word.lower()
-                )
+                msg, _ = await game_message_router.wait_for_answer(channel.id, matcher, remaining_time)
 
                 user_id = str(msg.author.id)
                 current_wins = self.user_wins.get(user_id, 0)